@@ -0,0 +1,92 @@
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+class DecodedAudioCache:
+    """Process-wide LRU cache of decoded PCM.
+
+    Entries are keyed by ``(realpath, size, mtime_ns)`` so a rewritten file is
+    never served stale, and evicted least-recently-used first once the
+    cached sample arrays exceed ``max_bytes``. Cached arrays are made
+    read-only; callers that modify samples must copy them first.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(path):
+        st = os.stat(path)
+        return (os.path.realpath(path), st.st_size, st.st_mtime_ns)
+
+    def get_or_decode(self, path, decode):
+        """Return the cached decode of ``path``, calling ``decode(path)`` on a miss.
+
+        ``decode`` must return a tuple whose first item is the sample array.
+        """
+        key = self.key_for(path)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = decode(path)
+        self._insert(key, value)
+        return value
+
+    def store(self, path, value):
+        """Record an already decoded ``value`` for ``path`` as it is on disk now."""
+        self._insert(self.key_for(path), value)
+
+    def _insert(self, key, value):
+        samples = value[0]
+        samples.flags.writeable = False
+        size = int(samples.nbytes)
+        with self._lock:
+            # Drop entries for older versions of the same file.
+            for old in [k for k in self._entries if k[0] == key[0]]:
+                self._nbytes -= int(self._entries.pop(old)[0].nbytes)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._nbytes += size
+            self._evict()
+
+    def _evict(self):
+        while self._nbytes > self.max_bytes and self._entries:
+            _, value = self._entries.popitem(last=False)
+            self._nbytes -= int(value[0].nbytes)
+            self.evictions += 1
+
+    def set_max_bytes(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._nbytes,
+                "max_bytes": self.max_bytes,
+            }
+
+decoded_audio_cache = DecodedAudioCache()
@@ -1,16 +1,68 @@
+import numpy as np
+
+# Bit order names follow np.packbits: "big" is MSB-first within each byte,
+# "little" LSB-first. The container always uses "big".
+
+def unpack_bits(data, bitorder: str = "big") -> np.ndarray:
+    """Bits of ``data`` as a uint8 array of 0/1, eight per byte."""
+    return np.unpackbits(np.frombuffer(memoryview(data).cast("B"), dtype=np.uint8), bitorder=bitorder)
+
+def pack_bits(bits, bitorder: str = "big") -> bytes:
+    """Inverse of :func:`unpack_bits`. Only bit 0 of each value counts; a
+    final partial byte is padded with zero bits."""
+    bits = np.asarray(bits)
+    if bits.dtype != np.uint8 or (bits.size and bits.max() > 1):
+        bits = (bits & 1).astype(np.uint8)
+    return np.packbits(bits, bitorder=bitorder).tobytes()
+
+def bits_to_symbols(bits, n_lsb: int) -> np.ndarray:
+    """Group bits n_lsb at a time into uint8 symbols.
+
+    The first bit of a group lands in bit 0 of its symbol, the order in
+    which groups are written into sample and padding-byte LSBs. A final
+    partial group is padded with zero bits.
+    """
+    bits = np.asarray(bits, dtype=np.uint8)
+    rem = -bits.size % n_lsb
+    if rem:
+        bits = np.concatenate([bits, np.zeros(rem, dtype=np.uint8)])
+    groups = bits.reshape(-1, n_lsb)
+    out = groups[:, 0].copy()
+    for j in range(1, n_lsb):
+        out |= groups[:, j] << np.uint8(j)
+    return out
+
+def symbols_to_bits(symbols, n_lsb: int) -> np.ndarray:
+    """Inverse of :func:`bits_to_symbols`: the low n_lsb bits of each symbol,
+    bit 0 first. Higher bits of the inputs are ignored."""
+    symbols = np.asarray(symbols)
+    out = np.empty((symbols.size, n_lsb), dtype=np.uint8)
+    for j in range(n_lsb):
+        out[:, j] = (symbols >> j) & 1
+    return out.ravel()
+
+def bytes_to_symbols(data, n_lsb: int, bitorder: str = "big") -> np.ndarray:
+    """:func:`bits_to_symbols` of the bits of ``data``."""
+    return bits_to_symbols(unpack_bits(data, bitorder), n_lsb)
+
+def symbols_to_bytes(symbols, n_lsb: int, nbits: int = None, bitorder: str = "big") -> bytes:
+    """Bytes carried by ``symbols``, keeping only the first ``nbits`` bits if
+    given; a final partial byte is padded with zero bits."""
+    bits = symbols_to_bits(symbols, n_lsb)
+    if nbits is not None:
+        bits = bits[:nbits]
+    return pack_bits(bits, bitorder)
+
+# Per-bit API, kept for compatibility; both work through the array functions.
+
+_GEN_CHUNK = 1 << 16
+
 def bits_from_bytes(data: bytes):
-    for b in data:
-        for i in range(7,-1,-1):
-            yield (b >> i) & 1
+    mv = memoryview(data).cast("B")
+    for i in range(0, len(mv), _GEN_CHUNK):
+        yield from unpack_bits(mv[i:i + _GEN_CHUNK]).tolist()
 
 def bytes_from_bits(bits):
-    out = bytearray()
-    cur = 0; cnt = 0
-    for bit in bits:
-        cur = (cur<<1) | (bit & 1)
-        cnt += 1
-        if cnt == 8:
-            out.append(cur); cur = 0; cnt = 0
-    if cnt:
-        out.append(cur << (8-cnt))
-    return bytes(out)
+    if not isinstance(bits, np.ndarray):
+        bits = np.fromiter(bits, dtype=np.int64)
+    return pack_bits(bits)
@@ -1,16 +1,20 @@
-from pathlib import Path
 from .mp3stream import MP3Stream
 
-def capacity_bits(data: bytes, n_lsb: int) -> int:
-    st = MP3Stream(data)
-    slots = sum(1 for _ in st.iter_padding_slots())
+def capacity_bits(data, n_lsb: int) -> int:
+    """``data`` is the MP3 contents, a path or a binary file object."""
+    with MP3Stream(data) as st:
+        slots = st.padding_slots().size
     return slots * n_lsb
 
 def capacity_bits_for_file(path: str, n_lsb: int) -> int:
-    b = Path(path).read_bytes()
-    return capacity_bits(b, n_lsb)
+    return capacity_bits(path, n_lsb)
 
 def analyze_cover_file(path: str):
-    b = Path(path).read_bytes()
-    st = MP3Stream(b)
-    return st.stats()
+    with MP3Stream(path) as st:
+        return st.stats()
+
+def estimate_capacity_bits_for_file(path: str, n_lsb: int) -> int:
+    """:func:`capacity_bits_for_file` predicted from the file's first frames
+    (see :meth:`MP3Stream.estimate`) instead of a full scan."""
+    with MP3Stream(path) as st:
+        return st.estimate()["padded_frames"] * n_lsb
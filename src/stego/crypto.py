@@ -1,14 +1,110 @@
-def _keystream(key: bytes, n: int) -> bytes:
-    if not key: return b""
-    out = bytearray()
-    while len(out) < n:
-        out.extend(key)
-    return bytes(out[:n])
-
-def vigenere256_encrypt(data: bytes, key: bytes) -> bytes:
-    ks = _keystream(key, len(data))
-    return bytes(((d + ks[i]) & 0xFF) for i, d in enumerate(data))
-
-def vigenere256_decrypt(data: bytes, key: bytes) -> bytes:
-    ks = _keystream(key, len(data))
-    return bytes(((d - ks[i]) & 0xFF) for i, d in enumerate(data))
+def _keystream(key: bytes, n: int, offset: int = 0):
+    """The key repeated over ``n`` bytes, starting at key phase ``offset``,
+    as a uint8 array."""
+    import numpy as np
+    k = np.roll(np.frombuffer(key, dtype=np.uint8), -(offset % len(key)))
+    return np.tile(k, -(-n // k.size))[:n]
+
+def _vigenere(data, key: bytes, offset: int, sign: int) -> bytes:
+    import numpy as np
+    buf = np.frombuffer(memoryview(data).cast("B"), dtype=np.uint8)
+    if buf.size == 0:
+        return b""
+    if not key:
+        raise ValueError("Key must not be empty")
+    ks = _keystream(key, buf.size, offset)
+    # uint8 arithmetic wraps modulo 256, which is exactly the cipher.
+    out = np.add(buf, ks) if sign > 0 else np.subtract(buf, ks)
+    return out.tobytes()
+
+def vigenere256_encrypt(data: bytes, key: bytes, offset: int = 0) -> bytes:
+    """Encrypt ``data``; ``offset`` is its position in the full message, so a
+    slice can be processed with the right key phase."""
+    return _vigenere(data, key, offset, 1)
+
+def vigenere256_decrypt(data: bytes, key: bytes, offset: int = 0) -> bytes:
+    """Inverse of :func:`vigenere256_encrypt` for the same ``key`` and ``offset``."""
+    return _vigenere(data, key, offset, -1)
+
+class Vigenere256:
+    """Vigenere-256 over a byte stream processed in pieces.
+
+    ``offset`` is the message position of the next byte; each call advances
+    it, so chunks fed in order give the same bytes as one call over the
+    whole message. ``seek`` jumps to any position for random access.
+    """
+
+    def __init__(self, key: bytes, offset: int = 0):
+        if not key:
+            raise ValueError("Key must not be empty")
+        self.key = bytes(key)
+        self.offset = offset
+
+    def seek(self, offset: int):
+        self.offset = offset
+
+    def encrypt(self, data) -> bytes:
+        out = vigenere256_encrypt(data, self.key, self.offset)
+        self.offset += len(out)
+        return out
+
+    def decrypt(self, data) -> bytes:
+        out = vigenere256_decrypt(data, self.key, self.offset)
+        self.offset += len(out)
+        return out
+
+# SHAKE-256 in counter mode: block ``j`` of the keystream is
+# SHAKE-256(domain || len(key) || key || nonce || j) truncated to SHAKE_BLOCK
+# bytes, so any offset is reachable without generating what comes before it.
+SHAKE_BLOCK = 1 << 16
+_SHAKE_DOMAIN = b"stego/shake256-ctr\0"
+
+def _shake_base(key: bytes, nonce: bytes):
+    import hashlib
+    if not key:
+        raise ValueError("Key must not be empty")
+    return hashlib.shake_256(_SHAKE_DOMAIN + len(key).to_bytes(4, "little") + bytes(key) + bytes(nonce))
+
+def _shake_xor(data, base, offset: int) -> bytes:
+    import numpy as np
+    buf = np.frombuffer(memoryview(data).cast("B"), dtype=np.uint8)
+    out = np.empty_like(buf)
+    pos = 0
+    while pos < buf.size:
+        block, skip = divmod(offset + pos, SHAKE_BLOCK)
+        n = min(buf.size - pos, SHAKE_BLOCK - skip)
+        h = base.copy()
+        h.update(block.to_bytes(8, "little"))
+        ks = np.frombuffer(h.digest(skip + n), dtype=np.uint8)[skip:]
+        np.bitwise_xor(buf[pos:pos + n], ks, out=out[pos:pos + n])
+        pos += n
+    return out.tobytes()
+
+def shake256_xor(data, key: bytes, nonce: bytes, offset: int = 0) -> bytes:
+    """XOR ``data`` with the SHAKE-256 keystream for ``key``/``nonce`` starting
+    at message position ``offset``. Encrypts and decrypts."""
+    return _shake_xor(data, _shake_base(key, nonce), offset)
+
+class ShakeStream:
+    """SHAKE-256 counter-mode stream cipher with the :class:`Vigenere256` interface."""
+
+    def __init__(self, key: bytes, nonce: bytes, offset: int = 0):
+        self._base = _shake_base(key, nonce)
+        self.offset = offset
+
+    def seek(self, offset: int):
+        self.offset = offset
+
+    def encrypt(self, data) -> bytes:
+        out = _shake_xor(data, self._base, self.offset)
+        self.offset += len(out)
+        return out
+
+    decrypt = encrypt
+
+def mac_hasher(key: bytes, digest_size: int = 16):
+    """Keyed BLAKE2b for container tags. The key is first hashed down, so
+    keys of any length (BLAKE2b takes at most 64 bytes) are accepted."""
+    import hashlib
+    mac_key = hashlib.blake2b(bytes(key), digest_size=32, person=b"stego-mac-key").digest()
+    return hashlib.blake2b(key=mac_key, digest_size=digest_size)
@@ -0,0 +1,206 @@
+import os
+import struct
+import hashlib
+import threading
+
+import numpy as np
+
+from .mp3stream import FRAME_DTYPE
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Bytes hashed from each end of a file for its cache key.
+FINGERPRINT_BYTES = 1 << 16
+# Share of max_bytes an eviction brings the cache down to, so the
+# directory scan it takes is paid once per many stores.
+EVICT_TO = 0.9
+
+_MAGIC = b"STGFIDX1"
+_HEADER = struct.Struct("<8s32sQ")    # magic, key, frame count
+_SUFFIX = ".fidx"
+
+class FrameIndexCache:
+    """Persistent cache of MP3 frame indexes, one sidecar file per cover.
+
+    Entries live in ``directory`` and are keyed by a hash of the file size,
+    mtime and its first and last ``FINGERPRINT_BYTES`` bytes, so a renamed
+    or moved cover still hits while a rewritten one misses (as does a copy
+    that does not keep the mtime, e.g. ``cp`` without ``-p``). Each entry
+    holds its key and frame count, and anything that does not check out is
+    treated as stale and removed.
+
+    The entries' total size is tracked in memory, seeded from one scan of
+    the directory. Once it exceeds ``max_bytes`` the least recently used
+    entries are deleted down to ``EVICT_TO`` of it, rescanning the
+    directory to pick up what other processes wrote. With no directory the
+    cache is off.
+    """
+
+    def __init__(self, directory=None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self._nbytes = None         # total size of the entries, once known
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    @staticmethod
+    def key_for(path) -> bytes:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            h = hashlib.blake2b(struct.pack("<QQ", st.st_size, st.st_mtime_ns), digest_size=32)
+            h.update(f.read(FINGERPRINT_BYTES))
+            if st.st_size > FINGERPRINT_BYTES:
+                f.seek(max(FINGERPRINT_BYTES, st.st_size - FINGERPRINT_BYTES))
+                h.update(f.read(FINGERPRINT_BYTES))
+        return h.digest()
+
+    def _entry_path(self, key: bytes) -> str:
+        return os.path.join(self.directory, key.hex() + _SUFFIX)
+
+    def load(self, key: bytes):
+        """The cached index for ``key`` as a :data:`FRAME_DTYPE` array, or None."""
+        if not self.enabled:
+            return None
+        entry = self._entry_path(key)
+        try:
+            with open(entry, "rb") as f:
+                raw = f.read()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        index = None
+        if len(raw) >= _HEADER.size:
+            magic, stored, count = _HEADER.unpack_from(raw)
+            if magic == _MAGIC and stored == key and len(raw) == _HEADER.size + count * FRAME_DTYPE.itemsize:
+                index = np.frombuffer(raw, dtype=FRAME_DTYPE, offset=_HEADER.size).copy()
+        with self._lock:
+            if index is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if index is None:
+            if _remove(entry):
+                self._account(-len(raw))
+        else:
+            try:
+                os.utime(entry)
+            except OSError:
+                pass
+        return index
+
+    def store(self, key: bytes, index: np.ndarray):
+        """Save ``index`` under ``key``; failures to write are ignored."""
+        if not self.enabled:
+            return
+        data = _HEADER.pack(_MAGIC, key, len(index)) + np.ascontiguousarray(index, dtype=FRAME_DTYPE).tobytes()
+        if len(data) > self.max_bytes:
+            return
+        entry = self._entry_path(key)
+        tmp = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            old = os.stat(entry).st_size
+        except OSError:
+            old = 0
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, entry)
+        except OSError:
+            _remove(tmp)
+            return
+        with self._lock:
+            self.stores += 1
+        if self._account(len(data) - old) > self.max_bytes:
+            self._evict()
+
+    def _account(self, delta: int) -> int:
+        """Add ``delta`` to the tracked total, seeding it first if unknown."""
+        if self._nbytes is None:
+            total = sum(size for _, size, _ in self._entries())
+            with self._lock:
+                if self._nbytes is None:
+                    # The scan already saw the change being accounted for.
+                    self._nbytes = total
+                    return total
+        with self._lock:
+            self._nbytes += delta
+            return self._nbytes
+
+    def _entries(self):
+        """``(mtime_ns, size, path)`` of every entry, oldest first."""
+        out = []
+        try:
+            it = os.scandir(self.directory)
+        except OSError:
+            return out
+        with it:
+            for e in it:
+                if e.name.endswith(_SUFFIX):
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    out.append((st.st_mtime_ns, st.st_size, e.path))
+        out.sort()
+        return out
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            target = int(self.max_bytes * EVICT_TO)
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                if _remove(path):
+                    with self._lock:
+                        self.evictions += 1
+                total -= size
+        with self._lock:
+            self._nbytes = total
+
+    def set_directory(self, directory):
+        self.directory = directory
+        self._nbytes = None
+
+    def set_max_bytes(self, max_bytes: int):
+        self.max_bytes = int(max_bytes)
+        if self.enabled:
+            self._evict()
+
+    def clear(self):
+        if self.enabled:
+            for _, _, path in self._entries():
+                _remove(path)
+            self._nbytes = 0
+
+    def stats(self):
+        entries = self._entries() if self.enabled else []
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+            }
+
+def _remove(path) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+# Off unless STEGO_FRAME_INDEX_CACHE names a directory (or set_directory is called).
+frame_index_cache = FrameIndexCache(os.environ.get("STEGO_FRAME_INDEX_CACHE") or None)
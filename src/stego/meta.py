@@ -1,4 +1,5 @@
 import struct
+import zlib
 from dataclasses import dataclass
 
 MAGIC = b"STEG"
@@ -7,6 +8,21 @@ HDR_FMT = "<4s B B B I H B"
 
 FLAG_ENC = 1 << 0
 FLAG_RND = 1 << 1
+# With FLAG_ENC: the body is XORed with a SHAKE-256 keystream instead of
+# Vigenere-256, and a random nonce sits between the name record and the body.
+FLAG_STREAM = 1 << 2
+STREAM_NONCE_LEN = 16
+# A keyed BLAKE2b tag over name record, nonce, body and preamble ends the blob.
+FLAG_MAC = 1 << 3
+TAG_LEN = 16
+
+# v2 container: a fixed-layout preamble, always written at 1 LSB from sample 0,
+# followed by a name record and the payload written with the preamble's n_lsb.
+VER2 = 2
+PREAMBLE_FMT = "<4s B B B Q"   # magic, version, n_lsb, flags, record+payload length
+PREAMBLE_LEN = struct.calcsize(PREAMBLE_FMT) + 4   # + CRC32 of the fields above
+RECORD_FMT = "<H B"            # name length, ext length
+KNOWN_FLAGS = FLAG_ENC | FLAG_RND | FLAG_STREAM | FLAG_MAC
 
 @dataclass
 class HeaderCfg:
@@ -25,13 +41,49 @@ def build_header(cfg: HeaderCfg) -> bytes:
     return head + name_b + ext_b
 
 def parse_header(buf: bytes):
-    MAGIC_LEN = 4
     if len(buf) < struct.calcsize(HDR_FMT):
         raise ValueError("Header too small")
     magic, ver, flags, n_lsb, payload_len, name_len, ext_len = struct.unpack_from(HDR_FMT, buf, 0)
-    if magic != MAGIC:
-        raise ValueError("Magic mismatch")
+    if magic != MAGIC or ver != VER:
+        raise ValueError("Header magic/version mismatch")
     off = struct.calcsize(HDR_FMT)
-    name = buf[off:off+name_len].decode('utf-8'); off += name_len
-    ext = buf[off:off+ext_len].decode('utf-8'); off += ext_len
+    if off + name_len + ext_len > len(buf):
+        raise ValueError("Header truncated")
+    name = bytes(buf[off:off+name_len]).decode('utf-8'); off += name_len
+    ext = bytes(buf[off:off+ext_len]).decode('utf-8'); off += ext_len
     return {"ver": ver, "flags": flags, "n_lsb": n_lsb, "payload_len": payload_len, "name": name, "ext": ext, "header_len": off}
+
+def build_preamble(n_lsb: int, flags: int, length: int) -> bytes:
+    fields = struct.pack(PREAMBLE_FMT, MAGIC, VER2, n_lsb, flags, length)
+    return fields + struct.pack("<I", zlib.crc32(fields))
+
+def parse_preamble(buf: bytes):
+    if len(buf) < PREAMBLE_LEN:
+        raise ValueError("Preamble too small")
+    fields = bytes(buf[:PREAMBLE_LEN - 4])
+    (crc,) = struct.unpack_from("<I", buf, PREAMBLE_LEN - 4)
+    magic, ver, n_lsb, flags, length = struct.unpack(PREAMBLE_FMT, fields)
+    if magic != MAGIC or ver != VER2:
+        raise ValueError("Preamble magic/version mismatch")
+    if zlib.crc32(fields) != crc:
+        raise ValueError("Preamble CRC mismatch")
+    if not 1 <= n_lsb <= 4 or flags & ~KNOWN_FLAGS or (flags & FLAG_STREAM and not flags & FLAG_ENC):
+        raise ValueError("Preamble fields out of range")
+    return {"ver": ver, "n_lsb": n_lsb, "flags": flags, "length": length}
+
+def build_name_record(name: str, ext: str) -> bytes:
+    name_b = name.encode('utf-8')
+    ext_b = ext.encode('utf-8')
+    return struct.pack(RECORD_FMT, len(name_b), len(ext_b)) + name_b + ext_b
+
+def parse_name_record(buf: bytes):
+    """Return ``(name, ext, record_len)`` for the name record at the start of ``buf``."""
+    off = struct.calcsize(RECORD_FMT)
+    if len(buf) < off:
+        raise ValueError("Name record too small")
+    name_len, ext_len = struct.unpack_from(RECORD_FMT, buf, 0)
+    if off + name_len + ext_len > len(buf):
+        raise ValueError("Name record truncated")
+    name = bytes(buf[off:off+name_len]).decode('utf-8'); off += name_len
+    ext = bytes(buf[off:off+ext_len]).decode('utf-8'); off += ext_len
+    return name, ext, off
@@ -1,5 +1,9 @@
+import bisect
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import List, Iterator
+from typing import Iterator, Optional
+
+import numpy as np
 
 BITRATES = {
     0b0001: 32, 0b0010: 40, 0b0011: 48, 0b0100: 56,
@@ -8,6 +12,8 @@ BITRATES = {
     0b1101: 256, 0b1110: 320
 }
 SAMPLERATES = {0b00: 44100, 0b01: 48000, 0b10: 32000}
+SAMPLES_PER_FRAME = 1152  # MPEG-1 Layer III
+LAME_ENCODERS = (b"LAME", b"Lavf", b"Lavc")
 
 @dataclass
 class Frame:
@@ -15,50 +21,505 @@ class Frame:
     size: int
     channels: int
     padding: int
+    bitrate: int = 0
+    samplerate: int = 0
+
+# One row of the frame index; 22 bytes per frame.
+FRAME_DTYPE = np.dtype([
+    ("offset", "<i8"), ("size", "<i4"), ("channels", "u1"),
+    ("padding", "u1"), ("bitrate", "<i4"), ("samplerate", "<i4"),
+])
+
+def _frames_of(index) -> Iterator[Frame]:
+    for i in range(0, len(index), 4096):
+        for row in index[i:i + 4096].tolist():
+            yield Frame(*row)
+
+class FrameList(Sequence):
+    """Read-only sequence of :class:`Frame` over a :data:`FRAME_DTYPE` array;
+    frames are built on access. ``array`` is the underlying index."""
+
+    def __init__(self, array):
+        self.array = array
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return FrameList(self.array[i])
+        return Frame(*self.array[i].tolist())
+
+    def __iter__(self):
+        return _frames_of(self.array)
+
+    def __eq__(self, other):
+        if isinstance(other, FrameList):
+            return np.array_equal(self.array, other.array)
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"FrameList({len(self)} frames)"
+
+def _be32(data, off: int) -> int:
+    return int.from_bytes(bytes(data[off:off+4]), "big")
+
+def parse_info_tag(data, fr: Frame) -> Optional[dict]:
+    """Parse a Xing/Info or VBRI tag stored in frame ``fr``, if any.
+
+    Returns ``{"kind", "frames", "bytes", "encoder_delay", "encoder_padding"}``;
+    ``frames``/``bytes`` are None when the tag omits them, and the encoder
+    delay/padding come from a LAME-style extension (0 when absent).
+    """
+    end = fr.offset + fr.size
+    at = fr.offset + 4 + (17 if fr.channels == 1 else 32)
+    kind = bytes(data[at:at+4])
+    if kind in (b"Xing", b"Info") and at + 8 <= end:
+        flags = _be32(data, at + 4)
+        p = at + 8
+        frames = nbytes = None
+        if flags & 1:
+            frames = _be32(data, p); p += 4
+        if flags & 2:
+            nbytes = _be32(data, p); p += 4
+        if flags & 4:
+            p += 100
+        if flags & 8:
+            p += 4
+        delay = padding = 0
+        if p + 24 <= end and bytes(data[p:p+4]) in LAME_ENCODERS:
+            v = int.from_bytes(bytes(data[p+21:p+24]), "big")
+            delay, padding = v >> 12, v & 0xFFF
+        return {"kind": kind.decode("ascii"), "frames": frames, "bytes": nbytes,
+                "encoder_delay": delay, "encoder_padding": padding}
+    at = fr.offset + 4 + 32
+    if bytes(data[at:at+4]) == b"VBRI" and at + 18 <= end:
+        return {"kind": "VBRI", "frames": _be32(data, at + 14), "bytes": _be32(data, at + 10),
+                "encoder_delay": 0, "encoder_padding": 0}
+    return None
+
+# Frames that must follow one another before a sync candidate is trusted.
+SYNC_CHAIN = 3
+
+_HEADER_TABLE = None
+
+def _header_table():
+    """Frame length, bitrate and sample rate for every value of header
+    bytes 1-2 (``byte1 << 8 | byte2``); length 0 marks an invalid header."""
+    global _HEADER_TABLE
+    if _HEADER_TABLE is None:
+        v = np.arange(1 << 16)
+        b1, b2 = v >> 8, v & 0xFF
+        br, sr, pad = (b2 >> 4) & 0b1111, (b2 >> 2) & 0b11, (b2 >> 1) & 0b1
+        kbps = np.array([BITRATES.get(k, 0) for k in range(16)])
+        rates = np.array([SAMPLERATES.get(k, 0) for k in range(4)])
+        valid = ((b1 & 0xE0) == 0xE0) & (((b1 >> 3) & 0b11) == 0b11) & (((b1 >> 1) & 0b11) == 0b01) \
+            & (kbps[br] > 0) & (rates[sr] > 0)
+        bitrate = np.where(valid, kbps[br] * 1000, 0)
+        samplerate = np.where(valid, rates[sr], 0)
+        length = np.where(valid, (144 * bitrate) // np.maximum(samplerate, 1) + pad, 0)
+        _HEADER_TABLE = (length, bitrate, samplerate)
+    return _HEADER_TABLE
+
+def _id3v2_end(data) -> int:
+    n = len(data)
+    if n >= 10 and data[:3] == b"ID3":
+        return 10 + (((data[6] & 0x7F) << 21) | ((data[7] & 0x7F) << 14) | ((data[8] & 0x7F) << 7) | (data[9] & 0x7F))
+    return 0
+
+def _audio_end(data, start: int) -> int:
+    """End of the audio data: the file end minus an ID3v1 tag and/or an
+    APEv2 tag (with its optional header) stored before it."""
+    end = len(data)
+    if end - start >= 128 and data[end-128:end-125] == b"TAG":
+        end -= 128
+    if end - start >= 32 and data[end-32:end-24] == b"APETAGEX":
+        size = int.from_bytes(data[end-20:end-16], "little")
+        flags = int.from_bytes(data[end-12:end-8], "little")
+        total = size + (32 if flags & 0x80000000 else 0)
+        if 32 <= total <= end - start:
+            end -= total
+    return end
+
+def _frame_candidates(data, start: int, stop: int, end: int):
+    """Every offset in ``[start, stop)`` holding a valid header for a frame
+    that fits before ``end``, with the decoded fields, as NumPy arrays."""
+    length, bitrate, samplerate = _header_table()
+    arr = np.frombuffer(data, dtype=np.uint8)
+    seg = arr[start:min(stop + 3, end)]
+    if seg.size < 4:
+        pos = np.zeros(0, dtype=np.int64)
+    else:
+        pos = np.flatnonzero((seg[:-3] == 0xFF) & ((seg[1:-2] & 0xE0) == 0xE0)) + start
+    key = (arr[pos + 1].astype(np.int64) << 8) | arr[pos + 2]
+    size = length[key]
+    ok = (size > 0) & (pos + size <= end)
+    pos, key, size = pos[ok], key[ok], size[ok]
+    return {
+        "offset": pos,
+        "size": size,
+        "channels": np.where((arr[pos + 3] >> 6) == 0b11, 1, 2),
+        "padding": (key >> 1) & 1,
+        "bitrate": bitrate[key],
+        "samplerate": samplerate[key],
+    }
+
+# Bytes of the file scanned per step of the lazy frame iterator.
+SCAN_CHUNK = 1 << 22
+# Bytes scanned per step, and frames wanted, when only the start is needed.
+PROBE_CHUNK = 1 << 13
+PROBE_FRAMES = 8
+# Smallest byte range handed to one worker by MP3Stream.scan_parallel.
+PARALLEL_SPLIT = 1 << 24
+# Longest MPEG-1 Layer III frame (320 kbps at 32 kHz, padded).
+MAX_FRAME_SIZE = 144 * 320000 // 32000 + 1
+
+def _open_source(source):
+    """``(data, mmap_or_None)`` for bytes-like data, a path or a binary file
+    object. Files are memory-mapped read-only where possible, so only the
+    pages the scan touches are ever read."""
+    import io
+    import os
+    import mmap
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return source, None
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return _open_source(f)
+    try:
+        fd = source.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return source.read(), None
+    if os.fstat(fd).st_size == 0:
+        return b"", None
+    m = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    return m, m
+
+def _scan_span(data, pos0: int, synced: bool, stop: int, end: int):
+    """Frames starting in ``[pos0, stop)`` of the audio ``data[:end]``, as a
+    :data:`FRAME_DTYPE` array, and the ``(pos, synced)`` state to scan on
+    from. ``synced`` says a frame is known to start at ``pos0``.
+
+    Sync candidates (0xFFE pattern) are found, decoded and linked to the
+    candidate right after them with NumPy, in a few passes over the data.
+    Once in sync, frames are followed header to header as before; to
+    (re)gain sync, a candidate is only trusted if it starts a chain of
+    ``SYNC_CHAIN`` valid frames of one sample rate, or a shorter chain
+    that ends the audio. Junk, album art and stray sync patterns thus
+    cost linear time and never become frames. Candidates are looked up a
+    few frames past ``stop`` so chains crossing it are judged exactly as
+    in a scan of the whole file: consecutive spans give the same frames
+    as one.
+    """
+    c = _frame_candidates(data, pos0, min(end, stop + SYNC_CHAIN * MAX_FRAME_SIZE), end)
+    pos, size, rate = c["offset"], c["size"], c["samplerate"]
+    m = pos.size
+
+    nxt = pos + size
+    j = np.minimum(np.searchsorted(pos, nxt), max(m - 1, 0))
+    has_next = (pos[j] == nxt) if m else np.zeros(0, dtype=bool)
+    follow = np.where(has_next, j, -1)
+    link = np.where(has_next & (rate[j] == rate), j, -1)
+    ends_audio = ~has_next & (end - nxt < 4)
+
+    cur = np.arange(m)
+    alive = np.ones(m, dtype=bool)
+    done = np.zeros(m, dtype=bool)
+    for _ in range(SYNC_CHAIN - 1):
+        done |= alive & ends_audio[cur]
+        alive &= ~done & (link[cur] >= 0)
+        cur = np.where(alive, link[cur], cur)
+    trusted = np.flatnonzero((done | alive) & (pos < stop)).tolist()
+    trusted_pos = pos[trusted].tolist()
+
+    accepted = []
+    follow = follow.tolist()
+    pos_list = pos.tolist()
+    nxt_list = nxt.tolist()
+    # Left in sync by the previous span: the frame at pos0 is the first candidate.
+    k = 0 if synced else -1
+    i = pos0
+    t = 0
+    while True:
+        while k >= 0 and pos_list[k] < stop:
+            accepted.append(k)
+            i = nxt_list[k]
+            k = follow[k]
+        if k >= 0:
+            break
+        t = bisect.bisect_left(trusted_pos, i, t)
+        if t == len(trusted_pos):
+            break
+        k = trusted[t]
+    rows = np.empty(len(accepted), FRAME_DTYPE)
+    for name in FRAME_DTYPE.names:
+        rows[name] = c[name][accepted]
+    synced = k >= 0
+    return rows, (pos_list[k] if synced else max(i, stop)), synced
+
+def _scan_range(path, a: int, b: int, end: int):
+    """Worker for :meth:`MP3Stream.scan_parallel`: :func:`_scan_span` over
+    ``[a, b)`` of the file at ``path``, starting out of sync."""
+    with open(path, "rb") as f:
+        data, m = _open_source(f)
+    try:
+        parts = []
+        pos, synced = a, False
+        while pos < b:
+            rows, pos, synced = _scan_span(data, pos, synced, min(b, pos + SCAN_CHUNK), end)
+            parts.append(rows)
+        return (np.concatenate(parts) if parts else np.zeros(0, FRAME_DTYPE)), pos, synced
+    finally:
+        if m is not None:
+            m.close()
 
 class MP3Stream:
-    def __init__(self, data: bytes):
-        self.data = data
-        self.frames: List[Frame] = []
-        self._scan()
-
-    def _scan(self):
-        i = 0; n = len(self.data)
-        if n >= 10 and self.data[:3] == b"ID3":
-            sz = ((self.data[6] & 0x7F) << 21) | ((self.data[7] & 0x7F) << 14) | ((self.data[8] & 0x7F) << 7) | (self.data[9] & 0x7F)
-            i = 10 + sz
-        while i + 4 <= n:
-            if self.data[i] == 0xFF and (self.data[i+1] & 0xE0) == 0xE0:
-                h = self.data[i:i+4]
-                version_id = (h[1] >> 3) & 0b11
-                layer = (h[1] >> 1) & 0b11
-                br = (h[2] >> 4) & 0b1111
-                sr = (h[2] >> 2) & 0b11
-                pad = (h[2] >> 1) & 0b1
-                ch_mode = (h[3] >> 6) & 0b11
-                if version_id != 0b11 or layer != 0b01:
-                    i += 1; continue
-                if br == 0 or br == 0b1111 or sr == 0b11:
-                    i += 1; continue
-                bitrate = BITRATES[br] * 1000
-                samplerate = SAMPLERATES[sr]
-                frame_len = int((144*bitrate)//samplerate + pad)
-                if frame_len <= 0 or i + frame_len > n:
-                    i += 1; continue
-                ch = 1 if ch_mode == 0b11 else 2
-                self.frames.append(Frame(offset=i, size=frame_len, channels=ch, padding=pad))
-                i += frame_len
+    """MPEG-1 Layer III frames of a file.
+
+    ``source`` is the file contents (bytes-like), a path or a binary file
+    object; paths and real files are memory-mapped. Frames are scanned
+    lazily, ``SCAN_CHUNK`` bytes at a time, as :meth:`iter_frames` (and so
+    :meth:`iter_padding_slots`) is consumed; :attr:`index` and
+    :attr:`frames` scan the rest of the file. The index is a
+    :data:`FRAME_DTYPE` array; :attr:`frames` views it as :class:`Frame`
+    objects. Use as a context manager, or call :meth:`close`, to unmap a
+    file early.
+
+    For a path, the index is looked up in ``cache`` (by default
+    :data:`stego.indexcache.frame_index_cache`, off unless configured)
+    and the scan skipped on a hit; a completed scan is stored there.
+    """
+
+    def __init__(self, source, cache=None):
+        import os
+        self._cache = self._cache_key = self._path = None
+        if isinstance(source, (str, os.PathLike)):
+            self._path = os.fspath(source)
+            from .indexcache import frame_index_cache
+            self._cache = cache if cache is not None else frame_index_cache
+            if self._cache.enabled:
+                self._cache_key = self._cache.key_for(source)
+        self.data, self._mmap = _open_source(source)
+        self._chunks = []           # FRAME_DTYPE arrays, in file order
+        self._starts = []           # index of the first frame of each chunk
+        self._count = 0
+        self._start = _id3v2_end(self.data)
+        self._end = _audio_end(self.data, self._start)
+        self._pos = self._start     # next byte to scan
+        self._synced = False        # a frame is known to start at _pos
+        if self._cache_key is not None:
+            cached = self._cache.load(self._cache_key)
+            if cached is not None:
+                self._chunks, self._starts, self._count = [cached], [0], cached.size
+                self._pos = self._end
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def index(self) -> np.ndarray:
+        """The frame index of the whole file as a :data:`FRAME_DTYPE` array."""
+        while self._pos < self._end:
+            self._scan_chunk()
+        return self._joined()
+
+    def _joined(self) -> np.ndarray:
+        if len(self._chunks) != 1:
+            self._chunks = [np.concatenate(self._chunks) if self._chunks else np.zeros(0, FRAME_DTYPE)]
+            self._starts = [0]
+        return self._chunks[0]
+
+    @property
+    def frames(self) -> FrameList:
+        return FrameList(self.index)
+
+    def _iter_rows(self) -> Iterator[np.ndarray]:
+        """Yield the index in pieces, scanning only as far as consumed."""
+        i = 0
+        while True:
+            if i < self._count:
+                c = bisect.bisect_right(self._starts, i) - 1
+                rows = self._chunks[c][i - self._starts[c]:]
+                i += len(rows)
+                yield rows
+            elif self._pos >= self._end:
+                return
             else:
-                i += 1
+                self._scan_chunk()
+
+    def iter_frames(self) -> Iterator[Frame]:
+        """Yield frames in file order, scanning only as far as consumed."""
+        for rows in self._iter_rows():
+            yield from _frames_of(rows)
+
+    def _scan_chunk(self, nbytes: int = None):
+        """Scan the frames starting in the next ``nbytes`` (``SCAN_CHUNK``)
+        bytes of the audio; see :func:`_scan_span`."""
+        stop = min(self._end, self._pos + (nbytes or SCAN_CHUNK))
+        rows, self._pos, self._synced = _scan_span(self.data, self._pos, self._synced, stop, self._end)
+        self._append(rows)
+        if self._pos >= self._end and self._cache_key is not None:
+            self._cache.store(self._cache_key, self._joined())
+
+    def _append(self, rows):
+        if rows.size:
+            self._chunks.append(rows)
+            self._starts.append(self._count)
+            self._count += rows.size
+
+    def scan_parallel(self, workers: int = None, split: int = PARALLEL_SPLIT) -> np.ndarray:
+        """:attr:`index`, with the unscanned part of the file split into byte
+        ranges of at least ``split`` bytes and scanned by ``workers``
+        processes (default: one per CPU).
+
+        Each worker starts out of sync at its range start and finds frames
+        with the usual chain validation. Merging then rescans the start of
+        each range from the state the previous ranges left, a few KB at a
+        time, until it accepts a frame the worker also accepted; from
+        there both scans agree, so the result equals the serial scan.
+        Falls back to the serial scan for in-memory sources, one worker or
+        a file too small to split.
+        """
+        import os
+        from concurrent.futures import ProcessPoolExecutor
+        workers = workers or os.cpu_count() or 1
+        remaining = self._end - self._pos
+        n = min(4 * workers, remaining // max(split, 1))
+        if self._path is None or workers < 2 or n < 2:
+            return self.index
+        bounds = [self._pos + remaining * k // n for k in range(n + 1)]
+        with ProcessPoolExecutor(min(workers, n)) as ex:
+            results = ex.map(_scan_range, [self._path] * n, bounds[:-1], bounds[1:], [self._end] * n)
+            for b, (rows, pos, synced) in zip(bounds[1:], results):
+                self._merge(b, rows, pos, synced)
+        if self._cache_key is not None:
+            self._cache.store(self._cache_key, self._joined())
+        return self._joined()
+
+    def _merge(self, b: int, rows, pos: int, synced: bool):
+        """Take over a worker's ``rows`` for the range ending at ``b``, whose
+        scan ended in state ``(pos, synced)``."""
+        if not rows.size and not self._synced:
+            # The worker found no frame to trust anywhere in its range.
+            self._pos = max(self._pos, b)
+            return
+        offsets = rows["offset"]
+        while self._pos < b:
+            got, self._pos, self._synced = _scan_span(self.data, self._pos, self._synced,
+                                                      min(b, self._pos + PROBE_CHUNK), self._end)
+            hit = np.flatnonzero(np.isin(got["offset"], offsets))
+            if hit.size:
+                h = int(hit[0])
+                self._append(got[:h])
+                self._append(rows[int(np.searchsorted(offsets, got["offset"][h])):])
+                self._pos, self._synced = pos, synced
+                return
+            self._append(got)
 
     def iter_padding_slots(self) -> Iterator[int]:
         """Yield absolute byte offsets for padding bytes (end of frames with padding=1)."""
-        for fr in self.frames:
-            if fr.padding == 1:
-                yield fr.offset + fr.size - 1
-
-    def stats(self):
-        total = len(self.frames)
-        padded = sum(1 for _ in self.iter_padding_slots())
-        stereo = any(fr.channels == 2 for fr in self.frames)
+        for rows in self._iter_rows():
+            yield from _padding_slots(rows).tolist()
+
+    def padding_slots(self) -> np.ndarray:
+        """Every padding-byte offset of the file, as an int64 array."""
+        return _padding_slots(self.index)
+
+    def _probe(self) -> np.ndarray:
+        """The first ``PROBE_FRAMES`` frames (fewer in a short file), scanning
+        only a few KB if that is all it takes."""
+        while self._count < PROBE_FRAMES and self._pos < self._end:
+            self._scan_chunk(PROBE_CHUNK)
+        if self._chunks and self._chunks[0].size < PROBE_FRAMES:
+            self._joined()
+        return self._chunks[0][:PROBE_FRAMES] if self._chunks else np.zeros(0, FRAME_DTYPE)
+
+    def info_tag(self) -> Optional[dict]:
+        """Xing/Info/VBRI tag carried by the first frame, see :func:`parse_info_tag`."""
+        probe = self._probe()
+        return parse_info_tag(self.data, Frame(*probe[0].tolist())) if probe.size else None
+
+    def estimate(self) -> dict:
+        """Frame count, duration and padded-frame count from the start of the
+        file, without scanning the rest.
+
+        A Xing/Info or VBRI tag gives the frame count directly; otherwise the
+        audio size is divided by the frame size the bitrate implies (exact
+        for CBR, the mean of the first frames for VBR). For CBR the padded
+        count is what the encoder's padding rule yields over that many
+        frames; for VBR it follows the share of padded frames among the
+        first ones (0 when none is). If
+        the whole file is already indexed, or too short to probe, the exact
+        figures are returned instead; ``method`` tells which (``"xing"``,
+        ``"info"``, ``"vbri"``, ``"cbr"``, ``"vbr"`` or ``"scan"``).
+
+        ``total_frames`` counts frames as :attr:`index` does, a tag frame
+        included; ``duration`` is in seconds of audio, with encoder delay
+        and padding removed when a LAME tag records them.
+        """
+        probe = self._probe()
+        if self._pos >= self._end or probe.size < PROBE_FRAMES:
+            index = self.index
+            return self._estimate(index.size, int(np.count_nonzero(index["padding"])), index[:1], "scan")
+        tag = parse_info_tag(self.data, Frame(*probe[0].tolist()))
+        audio = probe[1:] if tag is not None else probe
+        rate = int(audio["samplerate"][0])
+        nominal = 144 * audio["bitrate"].astype(np.int64) / rate
+        if tag is not None and tag["frames"] is not None:
+            total = tag["frames"] + 1
+            method = tag["kind"].lower()
+        else:
+            nbytes = tag["bytes"] if tag is not None and tag["bytes"] else self._end - int(audio["offset"][0])
+            cbr = bool(np.all(audio["bitrate"] == audio["bitrate"][0]))
+            mean = nominal[0] if cbr else float(audio["size"].mean())
+            total = int(round(nbytes / mean)) + (1 if tag is not None else 0)
+            method = "cbr" if cbr else "vbr"
+        if method in ("cbr", "info"):
+            # CBR encoders pad whenever the running byte count falls behind
+            # 144 * bitrate / samplerate, so a frame is padded at that rate.
+            ratio = float(np.mean(nominal - np.floor(nominal)))
+        else:
+            # VBR encoders pick the bitrate per frame and rarely pad (LAME
+            # never does); go by what the probed frames show.
+            ratio = float(np.mean(audio["padding"]))
+        padded = int(round((total - (tag is not None)) * ratio))
+        return self._estimate(total, padded, probe[:1], method, tag)
+
+    def _estimate(self, total, padded, first, method, tag=None) -> dict:
+        if not first.size:
+            return {"method": method, "total_frames": 0, "duration": 0.0, "padded_frames": 0}
+        if method == "scan" and total:
+            tag = parse_info_tag(self.data, Frame(*first[0].tolist()))
+        audio_frames = total - (1 if tag is not None else 0)
+        trim = tag["encoder_delay"] + tag["encoder_padding"] if tag is not None else 0
+        samples = max(audio_frames * SAMPLES_PER_FRAME - trim, 0)
+        return {"method": method, "total_frames": total, "duration": samples / int(first["samplerate"][0]),
+                "padded_frames": padded}
+
+    def stats(self, estimate: bool = False):
+        """Frame statistics of the whole file. With ``estimate``, the counts
+        come from :meth:`estimate` instead of a full scan."""
+        if estimate:
+            est = self.estimate()
+            probe = self._probe()
+            return {"total_frames": est["total_frames"], "padded_frames": est["padded_frames"],
+                    "stereo": bool(np.any(probe["channels"] == 2)), "valid": est["total_frames"] > 0}
+        index = self.index
+        total = len(index)
+        padded = int(np.count_nonzero(index["padding"]))
+        stereo = bool(np.any(index["channels"] == 2))
         return {"total_frames": total, "padded_frames": padded, "stereo": stereo, "valid": total>0}
+
+def _padding_slots(index) -> np.ndarray:
+    padded = index[index["padding"] == 1]
+    return padded["offset"] + padded["size"] - 1
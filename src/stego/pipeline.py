@@ -1,40 +1,79 @@
 
 from pathlib import Path
+from contextlib import contextmanager
+import os
+import hmac
+import mmap
 import struct
 from typing import Optional, Tuple, List
 
 from .capability_exceptions import CapacityError, ExtractError
-from .bitops import bits_from_bytes, bytes_from_bits
-from .crypto import vigenere256_encrypt, vigenere256_decrypt
+from .crypto import Vigenere256, ShakeStream, vigenere256_decrypt, mac_hasher
 from .seed import seed_from_key, start_index_from_seed
-
-MAGIC = b"STEG"
-VER = 1
-HDR_FMT = "<4s B B B I H B"
-FLAG_ENC = 1 << 0
-FLAG_RND = 1 << 1
+from .audiocache import decoded_audio_cache
+from .wavio import read_wav_info, PCM16File
+from .psnr import psnr_from_sse, audio_metrics
+from .meta import (
+    MAGIC, VER, HDR_FMT, FLAG_ENC, FLAG_RND, FLAG_STREAM, FLAG_MAC, PREAMBLE_LEN,
+    STREAM_NONCE_LEN, TAG_LEN,
+    HeaderCfg, build_header, parse_header,
+    build_preamble, parse_preamble, build_name_record, parse_name_record,
+)
+
+# v2 preamble occupies samples [0, _PREAMBLE_SAMPLES) at 1 LSB; the name record
+# and payload live in the samples after it.
+_PREAMBLE_SAMPLES = PREAMBLE_LEN * 8
+# Raised when a FLAG_MAC container's tag does not verify.
+_MAC_MISMATCH = "Tag autentikasi tidak cocok: key salah atau file stego rusak."
 
 def _build_header(encrypted: bool, randomized: bool, n_lsb: int, payload_len: int, name: str, ext: str) -> bytes:
-    name_b = name.encode("utf-8")
-    ext_b = ext.encode("utf-8")
-    flags = (FLAG_ENC if encrypted else 0) | (FLAG_RND if randomized else 0)
-    head = struct.pack(HDR_FMT, MAGIC, VER, flags, n_lsb, payload_len, len(name_b), len(ext_b))
-    return head + name_b + ext_b
+    return build_header(HeaderCfg(encrypted, randomized, n_lsb, payload_len, name, ext))
 
 def _parse_header(buf: bytes):
-    if len(buf) < struct.calcsize(HDR_FMT):
-        raise ValueError("Header too small")
-    magic, ver, flags, n_lsb, payload_len, name_len, ext_len = struct.unpack_from(HDR_FMT, buf, 0)
-    if magic != MAGIC or ver != VER:
-        raise ValueError("Header magic/version mismatch")
-    off = struct.calcsize(HDR_FMT)
-    if off + name_len + ext_len > len(buf):
-        raise ValueError("Header truncated")
-    name = buf[off:off+name_len].decode("utf-8"); off += name_len
-    ext  = buf[off:off+ext_len].decode("utf-8"); off += ext_len
-    return {"flags": flags, "n_lsb": n_lsb, "payload_len": payload_len, "name": name, "ext": ext, "header_len": off}
+    return parse_header(buf)
+
+# Body ciphers for FLAG_ENC: "vigenere" is the original Vigenere-256,
+# "shake256" the SHAKE-256 counter-mode stream cipher (FLAG_STREAM).
+CIPHERS = ("vigenere", "shake256")
+
+def _cipher_flags(encrypt: bool, cipher: str) -> int:
+    if cipher not in CIPHERS:
+        raise ValueError(f"cipher must be one of {CIPHERS}")
+    if not encrypt:
+        return 0
+    return FLAG_ENC | (FLAG_STREAM if cipher == "shake256" else 0)
+
+def _nonce_len(flags: int) -> int:
+    """Bytes of nonce stored between the name record and the body."""
+    return STREAM_NONCE_LEN if flags & FLAG_ENC and flags & FLAG_STREAM else 0
+
+def _tag_len(flags: int) -> int:
+    """Bytes of authentication tag at the end of the blob."""
+    return TAG_LEN if flags & FLAG_MAC else 0
+
+def _container_mac(key: str):
+    """Keyed hash a FLAG_MAC tag is computed with: feed it every blob byte
+    before the tag, then the preamble."""
+    return mac_hasher(key.encode('utf-8'), TAG_LEN)
+
+def _body_cipher(flags: int, key: str, nonce: bytes = b""):
+    """Cipher object for the body of a container with ``flags``, or None."""
+    if not flags & FLAG_ENC:
+        return None
+    if flags & FLAG_STREAM:
+        return ShakeStream(key.encode('utf-8'), nonce)
+    return Vigenere256(key.encode('utf-8'))
 
 def _decode_to_samples(path: str):
+    """Decode audio file into int16 PCM samples, served from the process-wide
+    decoded-audio cache when the file has not changed since the last decode.
+
+    Returns ``(samples, channels, frame_rate, sample_width)``; ``samples`` is
+    read-only and shared, so copy it before modifying.
+    """
+    return decoded_audio_cache.get_or_decode(str(path), _decode_uncached)
+
+def _decode_uncached(path: str):
     """Decode audio file into int16 PCM samples.
     
     For .wav (16-bit PCM), avoid external dependencies by using the stdlib
@@ -85,9 +124,69 @@ def _encode_samples_to_wav(samples, channels: int, frame_rate: int, out_path: st
         wf.setframerate(int(frame_rate))
         wf.writeframes(pcm.astype("<i2").tobytes())
 
+def _mp3_pcm_info(path: str):
+    """Predict what the ffmpeg decode of an MP3 yields from its frame headers.
+
+    Mirrors ffmpeg's handling of a leading Xing/Info frame (dropped from the
+    audio, with LAME encoder delay/padding trimmed). Returns None for layouts
+    it cannot predict: VBRI tags, tag frame counts that disagree with the
+    scan, or streams that change rate or channel count.
+    """
+    import numpy as np
+    from .mp3stream import MP3Stream, SAMPLES_PER_FRAME
+    with MP3Stream(path) as st:
+        index = st.index
+        if not index.size:
+            return None
+        rates = set(np.unique(index["samplerate"]).tolist())
+        chans = set(np.unique(index["channels"]).tolist())
+        if len(rates) != 1 or len(chans) != 1:
+            return None
+        frames = index.size
+        trim = 0
+        tag = st.info_tag()
+        if tag is not None:
+            if tag["kind"] == "VBRI":
+                return None
+            frames -= 1
+            if tag["frames"] is not None and tag["frames"] != frames:
+                return None
+            trim = tag["encoder_delay"] + tag["encoder_padding"]
+        per_channel = frames * SAMPLES_PER_FRAME - trim
+        if per_channel <= 0:
+            return None
+        ch = chans.pop()
+        return per_channel * ch, ch, rates.pop(), 2
+
+def _probe_audio_info(path: str):
+    """Return ``(total_samples, channels, frame_rate, sample_width)`` as
+    :func:`_decode_to_samples` would see them, reading headers only.
+
+    Returns None whenever the header alone is ambiguous (non-16-bit or
+    truncated WAVs, unusual MP3 layouts, other formats); callers then decode.
+    """
+    import os
+    ext = os.path.splitext(str(path))[1].lower()
+    try:
+        if ext == ".wav":
+            info = read_wav_info(path)
+            if not info.is_pcm16 or not info.complete:
+                return None
+            return info.total_samples, info.channels, info.samplerate, info.sample_width
+        if ext == ".mp3":
+            return _mp3_pcm_info(path)
+    except (OSError, ValueError):
+        return None
+    return None
+
 def _capacity_bits_pcm(path: str, n_lsb: int) -> int:
-    samples, ch, fr, sw = _decode_to_samples(path)
-    return int(samples.size) * int(n_lsb)
+    info = _probe_audio_info(path)
+    if info is None:
+        samples, ch, fr, sw = _decode_to_samples(path)
+        total = samples.size
+    else:
+        total = info[0]
+    return int(total) * int(n_lsb)
 
 def compute_capacity_for_file(cover_path: str, n_lsb: int) -> int:
     """Compute the steganographic capacity in bits for a given cover file.
@@ -114,7 +213,7 @@ def compute_capacity_for_file(cover_path: str, n_lsb: int) -> int:
     except Exception as e:
         raise Exception(f"Cannot compute capacity for {cover_path}: {e}") from e
 
-def calculate_payload_size(secret_path: str, key: str, n_lsb: int, encrypt: bool, use_rand_start: bool) -> int:
+def calculate_payload_size(secret_path: str, key: str, n_lsb: int, encrypt: bool, use_rand_start: bool, cipher: str = "vigenere", mac: bool = False) -> int:
     """Calculate the total size in bits needed to embed a secret file.
     
     Args:
@@ -123,133 +222,417 @@ def calculate_payload_size(secret_path: str, key: str, n_lsb: int, encrypt: bool
         n_lsb: Number of LSBs (affects header)
         encrypt: Whether encryption is used
         use_rand_start: Whether randomized start position is used
+        cipher: Body cipher when encrypting, one of CIPHERS
+        mac: Whether an authentication tag is appended
         
     Returns:
         Total bits needed including header and length prefix
+
+    Only the file size is read: encryption keeps the length unchanged and
+    the name record depends on the name alone.
     """
-    secret = Path(secret_path).read_bytes()
     name = Path(secret_path).stem
     ext = ''.join(Path(secret_path).suffixes) or ''
-    
-    body = vigenere256_encrypt(secret, key.encode('utf-8')) if encrypt else secret
-    hdr = _build_header(encrypted=encrypt, randomized=use_rand_start, n_lsb=n_lsb, 
-                       payload_len=len(body), name=name, ext=ext)
-    blob = hdr + body
-    # Add 4 bytes for length prefix
-    total_bytes = 4 + len(blob)
-    return total_bytes * 8
+    body_len = os.stat(secret_path).st_size
+    flags = _cipher_flags(encrypt, cipher) | (FLAG_MAC if mac else 0)
+    head_len = len(build_name_record(name, ext)) + _nonce_len(flags)
+    return _container_bits(head_len + body_len + _tag_len(flags), n_lsb)
+
+def _container_bits(blob_len: int, n_lsb: int) -> int:
+    """Capacity bits a v2 container with a ``blob_len``-byte record+payload uses.
+
+    The 1-LSB preamble samples are charged at the full n_lsb rate because
+    they are unavailable to the payload.
+    """
+    return _PREAMBLE_SAMPLES * n_lsb + blob_len * 8
 
 def analyze_cover_file(path: str):
-    samples, ch, fr, sw = _decode_to_samples(path)
-    total_frames = samples.size // ch
+    info = _probe_audio_info(path)
+    if info is None:
+        samples, ch, fr, sw = _decode_to_samples(path)
+        total = samples.size
+    else:
+        total, ch, fr, sw = info
+    total_frames = total // ch
     duration_sec = total_frames / float(fr) if fr else 0.0
     return {
         "valid": True,
         "channels": ch,
         "samplerate": fr,
         "sample_width": sw,
-        "total_samples": int(samples.size),
+        "total_samples": int(total),
         "total_frames": int(total_frames),
         "stereo": bool(ch == 2),
         "duration_sec": float(duration_sec),
     }
 
-def _embed_bits_into_samples(samples, bit_iter, n_lsb: int, start_seed_index: int):
-    """Embed bits into audio samples using LSB steganography.
-    
-    Handles partial LSB groups gracefully by padding with zeros when
-    the bit stream doesn't align with n_lsb boundaries.
+# Symbols handled per vectorized step; bounds the unpacked-bit scratch arrays.
+_KERNEL_CHUNK = 1 << 20
+
+def _wrap_runs(size: int, start: int, g0: int, g1: int):
+    """Split symbol indices [g0, g1) of a ring laid out from ``start`` into
+    contiguous runs, yielding ``(g_lo, g_hi, slot_lo)`` per run."""
+    g = g0
+    while g < g1:
+        slot = (start + g) % size
+        n = min(g1 - g, size - slot)
+        yield g, g + n, slot
+        g += n
+
+class _Payload:
+    """Bytes laid end to end from several buffers without ever joining them.
+
+    Each part is ``buf`` or ``(buf, cipher)``; a part with a cipher object
+    (see :mod:`stego.crypto`) reads as its ciphertext, encrypted window by
+    window. ``window(b0, b1)`` returns bytes
+    ``[b0, b1)``: a zero-copy view when the range sits inside one plain part,
+    otherwise a fresh buffer the size of the window only. Call ``release()``
+    before closing anything the parts were mapped from.
+    """
+
+    def __init__(self, *parts):
+        self._parts = []
+        self._ends = []
+        end = 0
+        for part in parts:
+            buf, cipher = part if isinstance(part, tuple) else (part, None)
+            mv = memoryview(buf).cast("B")
+            if not len(mv):
+                mv.release()
+                continue
+            end += len(mv)
+            self._parts.append((mv, cipher))
+            self._ends.append(end)
+
+    def __len__(self) -> int:
+        return self._ends[-1] if self._ends else 0
+
+    def append(self, buf):
+        mv = memoryview(buf).cast("B")
+        self._parts.append((mv, None))
+        self._ends.append(len(self) + len(mv))
+
+    def window(self, b0: int, b1: int):
+        pieces = []
+        lo = 0
+        for (mv, cipher), end in zip(self._parts, self._ends):
+            if b0 < end and b1 > lo:
+                a, b = max(b0, lo) - lo, min(b1, end) - lo
+                if cipher is None:
+                    pieces.append(mv[a:b])
+                else:
+                    cipher.seek(a)
+                    pieces.append(cipher.encrypt(mv[a:b]))
+            lo = end
+        if len(pieces) == 1:
+            return pieces[0]
+        return b"".join(pieces)
+
+    def feed(self, update):
+        """Pass every byte to ``update`` in order, ``_KERNEL_CHUNK`` at a
+        time; cipher parts are encrypted chunk by chunk on the way and
+        nothing is kept."""
+        for mv, cipher in self._parts:
+            if cipher is not None:
+                cipher.seek(0)
+            for b0 in range(0, len(mv), _KERNEL_CHUNK):
+                chunk = mv[b0:b0 + _KERNEL_CHUNK]
+                update(chunk if cipher is None else cipher.encrypt(chunk))
+
+    def release(self):
+        for mv, _ in self._parts:
+            mv.release()
+        self._parts = []
+
+def _as_payload(data) -> _Payload:
+    return data if isinstance(data, _Payload) else _Payload(data)
+
+def _symbols_from_bytes(data, n_lsb: int, g0: int, g1: int):
+    """Return symbols [g0, g1) of ``data`` as a uint8 array.
+
+    Symbol ``g`` is made of the MSB-first payload bits ``g*n_lsb .. g*n_lsb+n_lsb-1``;
+    the first of those bits lands in bit 0 of the symbol. Bits past the end of
+    ``data`` read as zero.
     """
     import numpy as np
+    from .bitops import unpack_bits, bits_to_symbols
+    bit0 = g0 * n_lsb
+    nbits = (g1 - g0) * n_lsb
+    data = _as_payload(data)
+    b0 = bit0 // 8
+    b1 = min(len(data), -(-(bit0 + nbits) // 8))
+    bits = unpack_bits(data.window(b0, b1))[bit0 % 8:bit0 % 8 + nbits]
+    if bits.size < nbits:
+        bits = np.concatenate([bits, np.zeros(nbits - bits.size, dtype=np.uint8)])
+    return bits_to_symbols(bits, n_lsb)
+
+def _write_symbols(seg, data, n_lsb: int, g0: int, g1: int):
+    """Overwrite the low n_lsb bits of ``seg`` with symbols [g0, g1) of ``data``."""
+    import numpy as np
+    seg &= np.array(~((1 << n_lsb) - 1)).astype(seg.dtype)
+    seg |= _symbols_from_bytes(data, n_lsb, g0, g1)
+
+def _embed_bits_into_samples(samples, data, n_lsb: int, start_seed_index: int):
+    """Embed the bits of ``data`` into audio samples using LSB steganography.
+
+    Bits are taken MSB-first and grouped n_lsb at a time; each group replaces
+    the low n_lsb bits of one sample, starting at ``start_seed_index`` and
+    wrapping at the end of the array. A final partial group is padded with
+    zeros. Works on whole slices of the array instead of single samples.
+    """
     N = samples.size
     if N == 0:
         return 0
-    mask = (1 << n_lsb) - 1
-    start = start_seed_index % N if N else 0
+    data = _as_payload(data)
+    total_bits = len(data) * 8
+    if total_bits == 0:
+        return 0
+    groups = -(-total_bits // n_lsb)
+    start = start_seed_index % N
 
-    written = 0
-    idx = start
-    
-    while True:
-        val = 0
-        bits_in_group = 0
-        
-        # Fill one sample's LSBs; if iterator exhausts early, pad remaining with 0
-        for j in range(n_lsb):
-            try:
-                bit = next(bit_iter)
-                val |= ((bit & 1) << j)
-                bits_in_group += 1
-            except StopIteration:
-                break
-        
-        if bits_in_group == 0:
-            # No more bits to write
-            break
-        
-        # Apply the LSB changes to the sample
-        s = int(samples[idx])
-        s = (s & ~mask) | val
-        samples[idx] = ((s + 0x8000) & 0xFFFF) - 0x8000
-        
-        # Count only actual payload bits written for accuracy near capacity
-        written += bits_in_group
-        
-        idx += 1
-        if idx == N:
-            idx = 0
-        
-        if bits_in_group < n_lsb:
-            # Last partial group handled; we're done
-            break
-    
-    return written
+    # Past one full lap every sample is overwritten again, so only the last
+    # N symbols can survive.
+    first = max(0, groups - N)
+    for c0 in range(first, groups, _KERNEL_CHUNK):
+        c1 = min(groups, c0 + _KERNEL_CHUNK)
+        for lo, hi, slot in _wrap_runs(N, start, c0, c1):
+            _write_symbols(samples[slot:slot + (hi - lo)], data, n_lsb, lo, hi)
+
+    return total_bits
 
 def _extract_bits_from_samples(samples, total_bits: int, n_lsb: int, start_seed_index: int) -> bytes:
+    """Read ``total_bits`` payload bits back out of the sample LSBs.
+
+    Inverse of :func:`_embed_bits_into_samples`: gathers the sample window
+    (wrapping at the end of the array), takes the low n_lsb bits of each
+    sample and packs them MSB-first, zero-padding the last byte. Works in
+    fixed-size chunks so scratch memory does not grow with the payload.
+    """
+    import numpy as np
+    from .bitops import symbols_to_bytes
     N = samples.size
-    if N == 0: return b""
+    need = int(total_bits)
+    if N == 0 or need <= 0:
+        return b""
     mask = (1 << n_lsb) - 1
     start = start_seed_index % N
-    bits = []
-    idx = start
-    need = int(total_bits)
-    while len(bits) < need:
-        s = int(samples[idx])
-        val = s & mask
-        for j in range(n_lsb):
-            bits.append((val >> j) & 1)
-            if len(bits) >= need:
-                break
-        idx += 1
-        if idx == N: idx = 0
-    out = bytearray()
-    b = 0; cnt = 0
-    for bit in bits:
-        b = (b << 1) | (bit & 1)
-        cnt += 1
-        if cnt == 8:
-            out.append(b); b = 0; cnt = 0
-    if cnt:
-        out.append(b << (8-cnt))
+    groups = -(-need // n_lsb)
+
+    out = bytearray(-(-need // 8))
+    view = memoryview(out)
+    # _KERNEL_CHUNK is a multiple of 8, so every chunk starts on a byte boundary.
+    for c0 in range(0, groups, _KERNEL_CHUNK):
+        c1 = min(groups, c0 + _KERNEL_CHUNK)
+        vals = np.empty(c1 - c0, dtype=np.uint8)
+        for lo, hi, slot in _wrap_runs(N, start, c0, c1):
+            vals[lo - c0:hi - c0] = (samples[slot:slot + (hi - lo)] & mask).astype(np.uint8)
+        bit0 = c0 * n_lsb
+        packed = symbols_to_bytes(vals, n_lsb, nbits=need - bit0)
+        view[bit0 // 8:bit0 // 8 + len(packed)] = packed
     return bytes(out)
 
-def embed_to_file(cover_path: str, secret_path: str, out_path: str, key: str, n_lsb: int, encrypt: bool, use_rand_start: bool, compute_psnr: bool = True):
+def _touched_runs(n_samples: int, n_lsb: int, blob_len: int, start: int):
+    """Sample ranges ``[lo, hi)`` a v2 embed of ``blob_len`` bytes can modify."""
+    region = n_samples - _PREAMBLE_SAMPLES
+    groups = min(region, -(-blob_len * 8 // n_lsb))
+    runs = [(0, _PREAMBLE_SAMPLES)]
+    for lo, hi, slot in _wrap_runs(region, start, 0, groups):
+        runs.append((_PREAMBLE_SAMPLES + slot, _PREAMBLE_SAMPLES + slot + (hi - lo)))
+    return runs
+
+def _psnr_in_memory(original, modified, runs):
+    """PSNR between two equal-length sample arrays that differ only inside ``runs``.
+
+    The squared error is summed exactly in integer arithmetic over the runs;
+    every other sample contributes zero error but still counts towards the mean.
+    """
+    import numpy as np
+    sse = 0
+    for lo, hi in runs:
+        for c0 in range(lo, hi, _KERNEL_CHUNK):
+            c1 = min(hi, c0 + _KERNEL_CHUNK)
+            d = modified[c0:c1].astype(np.int64) - original[c0:c1]
+            sse += int(np.dot(d, d))
+    return psnr_from_sse(sse, original.size)
+
+# Samples per block for the streaming WAV embed.
+_STREAM_BLOCK = 1 << 18
+
+def _ring_symbol_runs(size: int, start: int, r0: int, r1: int):
+    """Inverse of :func:`_wrap_runs`: for ring slots [r0, r1) laid out from
+    ``start``, yield ``(slot_lo, slot_hi, g_lo)`` runs of consecutive symbols."""
+    if r0 < start:
+        hi = min(r1, start)
+        yield r0, hi, r0 - start + size
+    lo = max(r0, start)
+    if lo < r1:
+        yield lo, r1, lo - start
+
+def _embed_container_window(arr, base: int, n_samples: int, preamble: bytes, blob, n_lsb: int, start: int):
+    """Embed the parts of a v2 container that land in samples
+    ``[base, base + arr.size)`` of an ``n_samples`` long cover into ``arr``.
+
+    Returns True if any sample in the window was touched.
+    """
+    hi = base + arr.size
+    touched = False
+    if base < _PREAMBLE_SAMPLES:
+        p_hi = min(hi, _PREAMBLE_SAMPLES)
+        _write_symbols(arr[:p_hi - base], preamble, 1, base, p_hi)
+        touched = True
+    region = n_samples - _PREAMBLE_SAMPLES
+    groups = min(region, -(-len(blob) * 8 // n_lsb))
+    r0 = max(base, _PREAMBLE_SAMPLES) - _PREAMBLE_SAMPLES
+    r1 = hi - _PREAMBLE_SAMPLES
+    for s_lo, s_hi, g_lo in _ring_symbol_runs(region, start, r0, r1):
+        g_hi = min(groups, g_lo + (s_hi - s_lo))
+        if g_lo >= g_hi:
+            continue
+        off = _PREAMBLE_SAMPLES + s_lo - base
+        _write_symbols(arr[off:off + (g_hi - g_lo)], blob, n_lsb, g_lo, g_hi)
+        touched = True
+    return touched
+
+def _embed_wav_streaming(cover_path: str, info, out_path: str, preamble: bytes, blob, n_lsb: int, start: int) -> int:
+    """Copy a 16-bit PCM WAV cover to ``out_path`` block by block, embedding
+    the container into the blocks it lands in. Returns the squared error."""
+    import wave
+    import numpy as np
+    from .wavio import iter_pcm16_blocks
+    n = info.total_samples
+    sse = 0
+    base = 0
+    with wave.open(out_path, "wb") as wf:
+        wf.setnchannels(int(info.channels))
+        wf.setsampwidth(2)
+        wf.setframerate(int(info.samplerate))
+        for block in iter_pcm16_blocks(cover_path, _STREAM_BLOCK, info):
+            work = block.copy()
+            if _embed_container_window(work, base, n, preamble, blob, n_lsb, start):
+                d = work.astype(np.int64) - block
+                sse += int(np.dot(d, d))
+            wf.writeframes(work.astype("<i2").tobytes())
+            base += block.size
+    return sse
+
+def _embed_wav_patch(cover_path: str, info, out_path: str, preamble: bytes, blob, n_lsb: int, start: int) -> int:
+    """Clone the cover to ``out_path`` and rewrite only the samples the
+    container touches, through a memory map of the ``data`` chunk. Every
+    other byte of the file, extra RIFF chunks included, is the cover's.
+    Returns the squared error."""
+    import numpy as np
+    from .wavio import clone_file, map_pcm16_data
+    n = info.total_samples
+    clone_file(cover_path, out_path)
+    mm = map_pcm16_data(out_path, info, writable=True)
+    sse = 0
+    try:
+        for lo, hi in _touched_runs(n, n_lsb, len(blob), start):
+            for c0 in range(lo, hi, _STREAM_BLOCK):
+                c1 = min(hi, c0 + _STREAM_BLOCK)
+                orig = np.array(mm[c0:c1])
+                work = orig.copy()
+                _embed_container_window(work, c0, n, preamble, blob, n_lsb, start)
+                mm[c0:c1] = work
+                d = work.astype(np.int64) - orig
+                sse += int(np.dot(d, d))
+        mm.flush()
+    finally:
+        del mm
+    return sse
+
+def _streamable_wav(cover_path: str, out_path: str):
+    """WavInfo for covers the streaming embed can handle, else None."""
+    import os
+    if os.path.splitext(cover_path)[1].lower() != ".wav":
+        return None
+    try:
+        info = read_wav_info(cover_path)
+        if os.path.exists(out_path) and os.path.samefile(cover_path, out_path):
+            return None
+    except (OSError, ValueError):
+        return None
+    return info if info.is_pcm16 and info.complete else None
+
+def _write_deficit_error(blob_bits: int, fitted: int) -> CapacityError:
+    actual_deficit = blob_bits - fitted
+    return CapacityError(
+        f"Gagal menulis semua bit yang diperlukan:\n"
+        f"  Diperlukan: {blob_bits:,} bits\n"
+        f"  Berhasil ditulis: {fitted:,} bits\n"
+        f"  Kekurangan: {actual_deficit:,} bits\n"
+        f"  Kemungkinan penyebab: kapasitas cover tidak mencukupi atau error internal."
+    )
+
+def _stego_out_path(out_path: str) -> str:
+    """Stego output is always WAV: swap an .mp3 suffix, append .wav otherwise."""
+    from pathlib import Path as _P
+    if out_path.lower().endswith(".mp3"):
+        out_path = str(_P(out_path).with_suffix(".wav"))
+    if not out_path.lower().endswith(".wav"):
+        out_path = out_path + ".wav"
+    return out_path
+
+@contextmanager
+def _mapped_file(path: str):
+    """Yield a read-only memory map of ``path`` (``b""`` for an empty file)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+def embed_to_file(cover_path: str, secret_path: str, out_path: str, key: str, n_lsb: int, encrypt: bool, use_rand_start: bool, compute_psnr: bool = True, streaming: Optional[bool] = None, patch_in_place: Optional[bool] = False, cipher: str = "vigenere", mac: bool = False):
+    """Embed ``secret_path`` into ``cover_path`` and write a stego WAV.
+
+    Two constant-memory paths exist for 16-bit PCM WAV covers. For each,
+    None uses it when the cover allows it, True requires it and False
+    never uses it.
+
+    - ``patch_in_place`` clones the cover file and rewrites only the touched
+      samples, keeping every other byte (extra RIFF chunks included). Off
+      by default.
+    - ``streaming`` copies the cover's samples to a fresh WAV block by
+      block. Without either, the whole cover is decoded into memory.
+
+    ``cipher`` picks the body cipher when ``encrypt`` is set (see CIPHERS).
+    ``mac`` appends a keyed tag that extraction checks before writing.
+
+    Returns the PSNR (or None).
+    """
     if n_lsb < 1 or n_lsb > 4:
         raise ValueError("n_lsb must be 1..4")
 
     cover_path = str(cover_path); secret_path = str(secret_path); out_path = str(out_path)
-    secret = Path(secret_path).read_bytes()
     name = Path(secret_path).stem
     ext  = ''.join(Path(secret_path).suffixes) or ''
 
-    body = vigenere256_encrypt(secret, key.encode('utf-8')) if encrypt else secret
+    flags = _cipher_flags(encrypt, cipher) | (FLAG_RND if use_rand_start else 0) | (FLAG_MAC if mac else 0)
+    nonce = os.urandom(_nonce_len(flags))
+    # The secret is mapped, not read, and encrypted window by window as the
+    # embedder asks for it; the container is never assembled in memory.
+    with _mapped_file(secret_path) as secret:
+        body_cipher = _body_cipher(flags, key, nonce)
+        body = secret if body_cipher is None else (secret, body_cipher)
+        blob = _Payload(build_name_record(name, ext), nonce, body)
+        try:
+            return _embed_blob(cover_path, out_path, key, n_lsb, flags, blob,
+                               compute_psnr, streaming, patch_in_place)
+        finally:
+            blob.release()
 
-    hdr = _build_header(encrypted=encrypt, randomized=use_rand_start, n_lsb=n_lsb, payload_len=len(body), name=name, ext=ext)
-    blob = hdr + body
-    buf = struct.pack(">I", len(blob)) + blob
+def _embed_blob(cover_path: str, out_path: str, key: str, n_lsb: int, flags: int, blob, compute_psnr: bool, streaming: Optional[bool], patch_in_place: Optional[bool]):
+    """Body of :func:`embed_to_file` once the v2 blob (name record + body) is
+    known. The tag, if ``flags`` asks for one, is appended here."""
+    use_rand_start = bool(flags & FLAG_RND)
+    preamble = build_preamble(n_lsb, flags, len(blob) + _tag_len(flags))
 
     cap = compute_capacity_for_file(cover_path, n_lsb)
-    need = len(buf) * 8
+    need = _container_bits(len(blob) + _tag_len(flags), n_lsb)
     
     if need > cap:
         # Calculate detailed capacity information for better error reporting
@@ -271,56 +654,172 @@ def embed_to_file(cover_path: str, secret_path: str, out_path: str, key: str, n_
     elif utilization > 80:
         print(f"Peringatan: Menggunakan {utilization:.1f}% kapasitas cover (mendekati batas)")
 
-    samples, channels, frame_rate, sample_width = _decode_to_samples(cover_path)
+    out_path = _stego_out_path(out_path)
+
+    if flags & FLAG_MAC:
+        # An ordered pass of its own: the embed loops below read the blob
+        # from the ring start, or in the cover's sample order.
+        h = _container_mac(key)
+        blob.feed(h.update)
+        h.update(preamble)
+        blob.append(h.digest())
+
+    seed = seed_from_key(key) if use_rand_start else 0
+    blob_bits = len(blob) * 8
+
+    wants_wav_path = patch_in_place is not False or streaming is not False
+    info = _streamable_wav(cover_path, out_path) if wants_wav_path else None
+    if (streaming or patch_in_place) and info is None:
+        raise ValueError("Streaming/patch embed needs a 16-bit PCM WAV cover distinct from the output")
+    use_patch = info is not None and patch_in_place is not False
+    if info is not None and (use_patch or streaming is not False):
+        region_size = info.total_samples - _PREAMBLE_SAMPLES
+        if blob_bits > region_size * n_lsb:
+            raise _write_deficit_error(blob_bits, max(0, region_size * n_lsb))
+        start = start_index_from_seed(region_size, seed)
+        embed_wav = _embed_wav_patch if use_patch else _embed_wav_streaming
+        sse = embed_wav(cover_path, info, out_path, preamble, blob, n_lsb, start)
+        return psnr_from_sse(sse, info.total_samples) if compute_psnr else None
+
+    cover_samples, channels, frame_rate, sample_width = _decode_to_samples(cover_path)
     
     # Ensure samples array is writable
     import numpy as np
-    samples = np.array(samples, copy=True)
+    samples = np.array(cover_samples, copy=True)
 
-    seed = seed_from_key(key) if use_rand_start else 0
-    start = start_index_from_seed(samples.size, seed)
+    region = samples[_PREAMBLE_SAMPLES:]
+    start = start_index_from_seed(region.size, seed)
 
-    total_written = _embed_bits_into_samples(samples, bits_from_bytes(buf), n_lsb=n_lsb, start_seed_index=start)
-    if total_written < need:
+    _embed_bits_into_samples(samples[:_PREAMBLE_SAMPLES], preamble, n_lsb=1, start_seed_index=0)
+    total_written = _embed_bits_into_samples(region, blob, n_lsb=n_lsb, start_seed_index=start)
+    fitted = min(total_written, region.size * n_lsb)
+    if fitted < blob_bits:
         # This should not happen with improved partial group handling, but guard anyway
-        actual_deficit = need - total_written
-        raise CapacityError(
-            f"Gagal menulis semua bit yang diperlukan:\n"
-            f"  Diperlukan: {need:,} bits\n"
-            f"  Berhasil ditulis: {total_written:,} bits\n"
-            f"  Kekurangan: {actual_deficit:,} bits\n"
-            f"  Kemungkinan penyebab: kapasitas cover tidak mencukupi atau error internal."
-        )
+        raise _write_deficit_error(blob_bits, fitted)
 
-    # force .wav
-    from pathlib import Path as _P
-    if out_path.lower().endswith(".mp3"):
-        out_path = str(_P(out_path).with_suffix(".wav"))
-    if not out_path.lower().endswith(".wav"):
-        out_path = out_path + ".wav"
     _encode_samples_to_wav(samples, channels, frame_rate, out_path)
+    # The WAV holds exactly these samples; later PSNR/extract calls can reuse them.
+    decoded_audio_cache.store(out_path, (samples, channels, frame_rate, 2))
 
     psnr = None
     if compute_psnr:
         try:
-            psnr = _psnr_paths_generic(cover_path, out_path)
+            runs = _touched_runs(samples.size, n_lsb, len(blob), start)
+            psnr = _psnr_in_memory(cover_samples, samples, runs)
         except Exception:
             psnr = None
     return psnr
 
-def _try_extract_with_params(samples, key: str, n_lsb: int, use_rand_start: bool):
-    seed = seed_from_key(key) if use_rand_start else 0
-    start = start_index_from_seed(samples.size, seed)
+# Longest blob the extractor will believe a length prefix for.
+MAX_BLOB_LEN = 128 * 1024 * 1024
+# Length prefix plus the fixed part of the header: enough to reject a guess.
+_PROBE_LEN = 4 + struct.calcsize(HDR_FMT)
 
-    raw_len = _extract_bits_from_samples(samples, 32, n_lsb=n_lsb, start_seed_index=start)
-    if len(raw_len) < 4:
-        return None
-    total_len = struct.unpack(">I", raw_len[:4])[0]
-    if total_len <= 0 or total_len > 128 * 1024 * 1024:
-        return None
+class _ArraySamples:
+    """Sample source over an in-memory array; see :class:`stego.wavio.PCM16File`
+    for the on-disk equivalent."""
+
+    def __init__(self, samples):
+        self.samples = samples
+        self.size = samples.size
+
+    def read(self, lo: int, hi: int):
+        return self.samples[lo:hi]
+
+def _as_source(samples):
+    return samples if hasattr(samples, "read") else _ArraySamples(samples)
+
+def _open_source(path: str):
+    """Seek-based source for complete 16-bit PCM WAVs, decoded array otherwise."""
+    import os
+    if os.path.splitext(path)[1].lower() == ".wav":
+        try:
+            info = read_wav_info(path)
+            if info.is_pcm16 and info.complete:
+                return PCM16File(path, info)
+        except (OSError, ValueError):
+            pass
+    return _ArraySamples(_decode_to_samples(path)[0])
+
+def _read_ring(src, base: int, size: int, start: int, g0: int, g1: int):
+    """Samples carrying symbols [g0, g1) of a ring of ``size`` samples that
+    starts at sample ``base`` and is filled from ring slot ``start``."""
+    import numpy as np
+    parts = [src.read(base + slot, base + slot + (hi - lo)) for lo, hi, slot in _wrap_runs(size, start, g0, g1)]
+    return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+def _extract_ring(src, base: int, size: int, start: int, total_bits: int, n_lsb: int) -> bytes:
+    """:func:`_extract_bits_from_samples` over a sample source, reading only
+    the samples that carry the requested bits, one chunk at a time."""
+    if size <= 0 or total_bits <= 0:
+        return b""
+    groups = -(-total_bits // n_lsb)
+    out = bytearray(-(-total_bits // 8))
+    for c0 in range(0, groups, _KERNEL_CHUNK):
+        c1 = min(groups, c0 + _KERNEL_CHUNK)
+        window = _read_ring(src, base, size, start, c0, c1)
+        bit0 = c0 * n_lsb
+        part = _extract_bits_from_samples(window, min(total_bits, c1 * n_lsb) - bit0, n_lsb, 0)
+        out[bit0 // 8:bit0 // 8 + len(part)] = part
+    return bytes(out)
+
+def _extract_ring_at(src, base: int, size: int, start: int, n_lsb: int, bit0: int, nbits: int) -> bytes:
+    """Like :func:`_extract_ring` but starting at payload bit ``bit0``, which
+    need not fall on a symbol boundary."""
+    from .bitops import unpack_bits, pack_bits
+    if size <= 0 or nbits <= 0:
+        return b""
+    g_first, lead = divmod(bit0, n_lsb)
+    raw = _extract_ring(src, base, size, (start + g_first) % size, lead + nbits, n_lsb)
+    if lead == 0:
+        return raw
+    return pack_bits(unpack_bits(raw)[lead:lead + nbits])
+
+def _probe_candidates(samples, key: str) -> List[Tuple[int, bool, int, int]]:
+    """Screen every (n_lsb, randomized) guess for a v1 container using only
+    the header prefix.
+
+    The first ``_PROBE_LEN`` bytes for all eight guesses are gathered from the
+    samples (an array or a sample source) in one go; a guess survives only if
+    its length prefix is plausible and the fixed header carries the right
+    magic, version, n_lsb and a payload length consistent with that prefix.
+    Returns ``(n_lsb, randomized, start, total_len)`` in the historical try order.
+    """
+    import numpy as np
+    from .bitops import symbols_to_bytes
+    src = _as_source(samples)
+    N = src.size
+    if N == 0:
+        return []
+    order = (True, False)
+    starts = [start_index_from_seed(N, seed_from_key(key) if rnd else 0) for rnd in order]
+    nbits = _PROBE_LEN * 8
+    # n_lsb=1 needs the widest window; larger n_lsb read a prefix of it.
+    window = np.stack([_read_ring(src, 0, N, start, 0, nbits) for start in starts])
+    fixed = struct.calcsize(HDR_FMT)
+
+    found = []
+    for n in (1, 2, 3, 4):
+        width = -(-nbits // n)
+        vals = (window[:, :width] & ((1 << n) - 1)).astype(np.uint8)
+        prefixes = [symbols_to_bytes(row, n, nbits=nbits) for row in vals]
+        for rnd, start, prefix in zip(order, starts, prefixes):
+            total_len = struct.unpack_from(">I", prefix)[0]
+            if total_len <= 0 or total_len > MAX_BLOB_LEN:
+                continue
+            magic, ver, _flags, hdr_n, payload_len, name_len, ext_len = struct.unpack_from(HDR_FMT, prefix, 4)
+            if magic != MAGIC or ver != VER or hdr_n != n:
+                continue
+            if fixed + name_len + ext_len + payload_len != total_len:
+                continue
+            found.append((n, rnd, start, total_len))
+    return found
 
+def _try_extract_with_params(samples, key: str, n_lsb: int, start: int, total_len: int):
+    """Extract and parse one candidate that already passed the probe."""
+    src = _as_source(samples)
     total_bits = (4 + total_len) * 8
-    raw_all = _extract_bits_from_samples(samples, total_bits, n_lsb=n_lsb, start_seed_index=start)
+    raw_all = _extract_ring(src, 0, src.size, start, total_bits, n_lsb)
     blob = raw_all[4:4+total_len]
 
     try:
@@ -337,43 +836,96 @@ def _try_extract_with_params(samples, key: str, n_lsb: int, use_rand_start: bool
         data = vigenere256_decrypt(data, key.encode('utf-8'))
     return data, meta
 
+def _read_preamble(src):
+    """Parsed v2 preamble of a sample source, or None if there is none."""
+    if src.size <= _PREAMBLE_SAMPLES:
+        return None
+    raw = _extract_bits_from_samples(src.read(0, _PREAMBLE_SAMPLES), _PREAMBLE_SAMPLES, n_lsb=1, start_seed_index=0)
+    try:
+        pre = parse_preamble(raw)
+    except ValueError:
+        return None
+    if pre["length"] * 8 > (src.size - _PREAMBLE_SAMPLES) * pre["n_lsb"]:
+        return None
+    return pre
+
+def _try_extract_v2(samples, key: str):
+    """Read a v2 container: one 1-LSB preamble probe says how to read the rest."""
+    src = _as_source(samples)
+    pre = _read_preamble(src)
+    if pre is None:
+        return None
+
+    region = src.size - _PREAMBLE_SAMPLES
+    n_lsb, length = pre["n_lsb"], pre["length"]
+    seed = seed_from_key(key) if pre["flags"] & FLAG_RND else 0
+    start = start_index_from_seed(region, seed)
+    blob = _extract_ring(src, _PREAMBLE_SAMPLES, region, start, length * 8, n_lsb)
+    try:
+        name, ext, record_len = parse_name_record(blob)
+    except ValueError:
+        return None
+
+    body_off = record_len + _nonce_len(pre["flags"])
+    tag_len = _tag_len(pre["flags"])
+    if body_off + tag_len > len(blob):
+        return None
+    if tag_len:
+        h = _container_mac(key)
+        h.update(memoryview(blob)[:len(blob) - tag_len])
+        h.update(build_preamble(n_lsb, pre["flags"], length))
+        if not hmac.compare_digest(h.digest(), bytes(blob[len(blob) - tag_len:])):
+            raise ExtractError(_MAC_MISMATCH)
+    data = blob[body_off:len(blob) - tag_len]
+    body_cipher = _body_cipher(pre["flags"], key, blob[record_len:body_off])
+    if body_cipher is not None:
+        data = body_cipher.decrypt(data)
+    meta = {"ver": pre["ver"], "flags": pre["flags"], "n_lsb": n_lsb, "payload_len": len(data),
+            "name": name, "ext": ext, "header_len": body_off}
+    return data, meta
+
+def _iter_extract_attempts(samples, key: str):
+    """Yield ``(data, meta)`` for each container reading that parses: the v2
+    preamble first, then the legacy v1 guesses."""
+    src = _as_source(samples)
+    attempt = _try_extract_v2(src, key)
+    if attempt is not None:
+        yield attempt
+    for n, rnd, start, total_len in _probe_candidates(src, key):
+        attempt = _try_extract_with_params(src, key, n_lsb=n, start=start, total_len=total_len)
+        if attempt is not None:
+            yield attempt
+
 def extract_to_file(stego_path: str, key: str, outdir: str):
-    stego_path = str(stego_path); outdir = str(outdir)
-    samples, channels, frame_rate, sample_width = _decode_to_samples(stego_path)
+    """Extract the secret hidden in ``stego_path`` into ``outdir``.
 
-    for n in (1,2,3,4):
-        for rnd in (True, False):
-            attempt = _try_extract_with_params(samples, key, n_lsb=n, use_rand_start=rnd)
-            if attempt is None:
-                continue
-            data, meta = attempt
+    16-bit PCM WAVs are read lazily: only the preamble and the samples that
+    carry the payload are read from disk. Other files are decoded in full.
+    """
+    stego_path = str(stego_path); outdir = str(outdir)
+    src = _open_source(stego_path)
+    try:
+        for data, meta in _iter_extract_attempts(src, key):
             out_name = f"{meta['name']}{meta['ext']}" or "extracted.bin"
             op = Path(outdir) / out_name
             op.write_bytes(data)
             flags = {"encrypted": bool(meta["flags"] & FLAG_ENC), "randomized": bool(meta["flags"] & FLAG_RND), "n_lsb": meta["n_lsb"]}
             return str(op), flags
+    finally:
+        if hasattr(src, "close"):
+            src.close()
 
     raise ExtractError("Cannot locate header. Pastikan file stego adalah WAV hasil embed versi ini dan key tepat.")
 
 def _psnr_paths_generic(p1: str, p2: str):
     try:
-        from pydub import AudioSegment
-        import numpy as np, math
-        a = AudioSegment.from_file(p1).get_array_of_samples()
-        b = AudioSegment.from_file(p2).get_array_of_samples()
-        ax = np.array(a, dtype=float)
-        bx = np.array(b, dtype=float)
-        n = min(len(ax), len(bx))
-        ax = ax[:n]; bx = bx[:n]
-        mse = ((ax - bx) ** 2).mean()
-        if mse == 0: return float('inf')
-        MAX = 32767.0
-        return 10.0 * math.log10((MAX*MAX)/mse)
+        return audio_metrics(p1, p2)["psnr"]
     except Exception:
         return None
 
 def check_embed_feasibility(cover_path: str, secret_path: str, key: str, n_lsb: int, 
-                          encrypt: bool = False, use_rand_start: bool = False) -> dict:
+                          encrypt: bool = False, use_rand_start: bool = False,
+                          cipher: str = "vigenere", mac: bool = False) -> dict:
     """Check if a secret file can be embedded in a cover file.
     
     Args:
@@ -383,6 +935,8 @@ def check_embed_feasibility(cover_path: str, secret_path: str, key: str, n_lsb:
         n_lsb: Number of LSBs to use (1-4)
         encrypt: Whether to encrypt the payload
         use_rand_start: Whether to use randomized start position
+        cipher: Body cipher when encrypting, one of CIPHERS
+        mac: Whether an authentication tag is appended
         
     Returns:
         Dict with keys:
@@ -395,7 +949,7 @@ def check_embed_feasibility(cover_path: str, secret_path: str, key: str, n_lsb:
     """
     try:
         capacity_bits = compute_capacity_for_file(cover_path, n_lsb)
-        need_bits = calculate_payload_size(secret_path, key, n_lsb, encrypt, use_rand_start)
+        need_bits = calculate_payload_size(secret_path, key, n_lsb, encrypt, use_rand_start, cipher, mac)
         
         fits = need_bits <= capacity_bits
         margin_bits = capacity_bits - need_bits
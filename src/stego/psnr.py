@@ -1,20 +1,127 @@
-def psnr_mp3_paths(cover_path: str, stego_path: str):
-    try:
-        from pydub import AudioSegment
-    except Exception:
+import math
+
+MAX_PCM16 = 32767.0
+
+def psnr_from_sse(sse: int, n: int, max_value: float = MAX_PCM16):
+    """PSNR in dB for a summed squared error ``sse`` over ``n`` samples."""
+    if n <= 0:
         return None
+    if sse == 0:
+        return float('inf')
+    mse = sse / n
+    return 10.0 * math.log10((max_value * max_value) / mse)
+
+# Samples per block for the streaming metrics engine.
+METRICS_BLOCK = 1 << 16
+
+def _iter_ffmpeg_blocks(path: str, block_samples: int):
+    """Stream interleaved int16 PCM out of ffmpeg without buffering the file."""
+    import subprocess
+    import numpy as np
+    from pydub.utils import get_encoder_name
+    cmd = [get_encoder_name(), "-nostdin", "-v", "error", "-i", str(path),
+           "-f", "s16le", "-acodec", "pcm_s16le", "-"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            raw = proc.stdout.read(block_samples * 2)
+            if not raw:
+                break
+            yield np.frombuffer(raw[:len(raw) & ~1], dtype="<i2")
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed to decode {path}")
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+def _iter_blocks(source, block_samples: int):
+    """Yield int16 sample blocks from an array, a 16-bit WAV path or any
+    ffmpeg-decodable path."""
+    import os
+    import numpy as np
+    from .wavio import read_wav_info, iter_pcm16_blocks
+    if isinstance(source, np.ndarray):
+        for i in range(0, source.size, block_samples):
+            yield source[i:i + block_samples]
+        return
+    path = str(source)
+    if os.path.splitext(path)[1].lower() == ".wav":
+        try:
+            info = read_wav_info(path)
+        except ValueError:
+            info = None
+        if info is not None and info.is_pcm16:
+            yield from iter_pcm16_blocks(path, block_samples, info)
+            return
+    yield from _iter_ffmpeg_blocks(path, block_samples)
+
+def _lockstep(it_a, it_b):
+    """Pair up two block streams into equal-length chunks, stopping at the
+    end of the shorter one."""
+    import numpy as np
+    empty = np.zeros(0, dtype=np.int16)
+    a = b = empty
+    while True:
+        if a.size == 0:
+            a = next(it_a, None)
+        if b.size == 0:
+            b = next(it_b, None)
+        if a is None or b is None:
+            return
+        n = min(a.size, b.size)
+        yield a[:n], b[:n]
+        a, b = a[n:], b[n:]
+
+def audio_metrics(source_a, source_b, block_samples: int = METRICS_BLOCK, max_value: float = MAX_PCM16):
+    """Compare two audio sources in one streaming pass.
+
+    Each source may be an int16 sample array or a path; paths are read
+    ``block_samples`` at a time (WAV directly, other formats through ffmpeg),
+    so memory use does not depend on duration. Like the PSNR helpers, the
+    comparison covers the length of the shorter source.
+
+    Returns a dict with ``samples``, ``mse``, ``psnr``, ``snr`` (``source_a``
+    taken as the signal), ``max_abs_diff``, ``changed_samples`` and the
+    ``first_changed``/``last_changed`` sample index (None when identical).
+    """
+    import numpy as np
+    n = sse = signal = max_abs = changed = 0
+    first = last = None
+    for a, b in _lockstep(_iter_blocks(source_a, block_samples), _iter_blocks(source_b, block_samples)):
+        a64 = a.astype(np.int64)
+        d = b.astype(np.int64) - a64
+        sse += int(np.dot(d, d))
+        signal += int(np.dot(a64, a64))
+        nz = np.flatnonzero(d)
+        if nz.size:
+            max_abs = max(max_abs, int(np.abs(d).max()))
+            changed += int(nz.size)
+            if first is None:
+                first = n + int(nz[0])
+            last = n + int(nz[-1])
+        n += a.size
+
+    if sse == 0:
+        snr = float('inf')
+    elif signal == 0:
+        snr = float('-inf')
+    else:
+        snr = 10.0 * math.log10(signal / sse)
+    return {
+        "samples": n,
+        "mse": sse / n if n else 0.0,
+        "psnr": psnr_from_sse(sse, n, max_value),
+        "snr": snr,
+        "max_abs_diff": max_abs,
+        "changed_samples": changed,
+        "first_changed": first,
+        "last_changed": last,
+    }
+
+def psnr_mp3_paths(cover_path: str, stego_path: str):
     try:
-        a = AudioSegment.from_mp3(cover_path).get_array_of_samples()
-        b = AudioSegment.from_mp3(stego_path).get_array_of_samples()
+        return audio_metrics(cover_path, stego_path)["psnr"]
     except Exception:
         return None
-    import numpy as np
-    ax = np.array(a, dtype=float)
-    bx = np.array(b, dtype=float)
-    n = min(len(ax), len(bx))
-    ax = ax[:n]; bx = bx[:n]
-    mse = ((ax - bx) ** 2).mean()
-    if mse == 0: return float('inf')
-    MAX = 32767.0
-    import math
-    return 10.0 * math.log10((MAX*MAX)/mse)
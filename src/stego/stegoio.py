@@ -0,0 +1,374 @@
+import io
+import os
+import hmac
+import math
+import struct
+
+from .capability_exceptions import CapacityError, ExtractError
+from .meta import (HDR_FMT, RECORD_FMT, FLAG_ENC, FLAG_RND, FLAG_MAC, build_preamble,
+                   build_name_record, parse_name_record)
+from .seed import seed_from_key, start_index_from_seed
+from .audiocache import decoded_audio_cache
+from .psnr import psnr_from_sse
+from .pipeline import (
+    _MAC_MISMATCH,
+    _PREAMBLE_SAMPLES,
+    _body_cipher,
+    _cipher_flags,
+    _container_mac,
+    _decode_to_samples,
+    _encode_samples_to_wav,
+    _extract_ring_at,
+    _nonce_len,
+    _open_source,
+    _parse_header,
+    _probe_candidates,
+    _read_preamble,
+    _stego_out_path,
+    _streamable_wav,
+    _tag_len,
+    _wrap_runs,
+    _write_deficit_error,
+    _write_symbols,
+)
+
+class StegoReader(io.RawIOBase):
+    """Seekable, read-only file object over the payload hidden in a stego file.
+
+    Payload byte offsets are mapped straight to the samples that carry them
+    (following the keyed start and its wraparound), and decryption starts at
+    the matching key phase, so ``read``/``readinto`` only touch the samples
+    for the bytes asked for. WAV stego files are read from disk on demand;
+    other formats are decoded once. Works with ``shutil.copyfileobj``.
+
+    For containers with an authentication tag, reading the payload front to
+    back checks the tag as it goes and raises ExtractError instead of
+    returning the last chunk if it does not match; ``verify()`` checks it
+    without producing any output.
+
+    Raises ExtractError if no v2 or v1 container is found for ``key``.
+    """
+
+    def __init__(self, stego_path: str, key: str):
+        super().__init__()
+        self._src = _open_source(str(stego_path))
+        self._pos = 0
+        try:
+            if not self._locate_v2(key) and not self._locate_v1(key):
+                raise ExtractError("Cannot locate header. Pastikan file stego adalah WAV hasil embed versi ini dan key tepat.")
+        except BaseException:
+            self._close_source()
+            raise
+
+    def _set_layout(self, base, size, start, n_lsb, data_bit0, payload_len, flags, name, ext, cipher,
+                    mac=None, preamble=b""):
+        self._layout = (base, size, start, n_lsb)
+        self._cipher = cipher
+        # ``mac`` has absorbed the blob up to the body; ``_mac`` follows
+        # sequential reads and is dropped once the reads stop being sequential.
+        self._mac_start = mac
+        self._mac = mac.copy() if mac is not None else None
+        self._mac_pos = 0
+        self._preamble = preamble
+        self.authenticated = mac is not None
+        self._data_bit0 = data_bit0
+        self.size = payload_len
+        self.meta = {"name": name, "ext": ext, "n_lsb": n_lsb, "flags": flags, "payload_len": payload_len}
+        self.flags = {"encrypted": bool(flags & FLAG_ENC), "randomized": bool(flags & FLAG_RND), "n_lsb": n_lsb}
+
+    def _read_bits(self, base, size, start, n_lsb, bit0, nbytes):
+        return _extract_ring_at(self._src, base, size, start, n_lsb, bit0, nbytes * 8)
+
+    def _locate_v2(self, key: str) -> bool:
+        pre = _read_preamble(self._src)
+        if pre is None:
+            return False
+        size = self._src.size - _PREAMBLE_SAMPLES
+        n_lsb, length = pre["n_lsb"], pre["length"]
+        seed = seed_from_key(key) if pre["flags"] & FLAG_RND else 0
+        start = start_index_from_seed(size, seed)
+        fixed = struct.calcsize(RECORD_FMT)
+        if length < fixed:
+            return False
+        name_len, ext_len = struct.unpack(RECORD_FMT, self._read_bits(_PREAMBLE_SAMPLES, size, start, n_lsb, 0, fixed))
+        record_len = fixed + name_len + ext_len
+        body_off = record_len + _nonce_len(pre["flags"])
+        tag_len = _tag_len(pre["flags"])
+        if body_off + tag_len > length:
+            return False
+        head = self._read_bits(_PREAMBLE_SAMPLES, size, start, n_lsb, 0, body_off)
+        try:
+            name, ext, _ = parse_name_record(head)
+        except ValueError:
+            return False
+        cipher = _body_cipher(pre["flags"], key, head[record_len:])
+        mac = None
+        if tag_len:
+            mac = _container_mac(key)
+            mac.update(head)
+        self._set_layout(_PREAMBLE_SAMPLES, size, start, n_lsb, body_off * 8,
+                         length - body_off - tag_len, pre["flags"], name, ext, cipher,
+                         mac, build_preamble(n_lsb, pre["flags"], length))
+        return True
+
+    def _locate_v1(self, key: str) -> bool:
+        size = self._src.size
+        fixed = struct.calcsize(HDR_FMT)
+        for n_lsb, _rnd, start, total_len in _probe_candidates(self._src, key):
+            head = self._read_bits(0, size, start, n_lsb, 32, fixed)
+            *_, name_len, ext_len = struct.unpack(HDR_FMT, head)
+            try:
+                meta = _parse_header(self._read_bits(0, size, start, n_lsb, 32, fixed + name_len + ext_len))
+            except ValueError:
+                continue
+            header_len = meta["header_len"]
+            # v1 predates FLAG_STREAM: its only cipher is Vigenere-256.
+            cipher = _body_cipher(meta["flags"] & FLAG_ENC, key)
+            self._set_layout(0, size, start, n_lsb, (4 + header_len) * 8,
+                             total_len - header_len, meta["flags"], meta["name"], meta["ext"], cipher)
+            return True
+        return False
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        self._checkClosed()
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._checkClosed()
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError(f"invalid whence ({whence})")
+        if pos < 0:
+            raise ValueError(f"negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def _raw(self, pos: int, n: int) -> bytes:
+        """Stored (still encrypted) payload bytes ``[pos, pos + n)``; ``pos``
+        may reach past the payload into the tag."""
+        base, size, start, n_lsb = self._layout
+        return self._read_bits(base, size, start, n_lsb, self._data_bit0 + pos * 8, n)
+
+    def _tag_matches(self, mac) -> bool:
+        mac.update(self._preamble)
+        return hmac.compare_digest(mac.digest(), self._raw(self.size, mac.digest_size))
+
+    def _follow_mac(self, data):
+        if self._mac is None:
+            return
+        if self._pos != self._mac_pos:
+            self._mac = None
+            return
+        self._mac.update(data)
+        self._mac_pos += len(data)
+        if self._mac_pos == self.size:
+            mac, self._mac = self._mac, None
+            if not self._tag_matches(mac):
+                raise ExtractError(_MAC_MISMATCH)
+
+    def verify(self, chunk: int = 1 << 20) -> bool:
+        """Check the authentication tag over the whole payload, decrypting and
+        returning nothing. Raises ValueError if the container has no tag."""
+        self._checkClosed()
+        if not self.authenticated:
+            raise ValueError("Container has no authentication tag")
+        mac = self._mac_start.copy()
+        for pos in range(0, self.size, chunk):
+            mac.update(self._raw(pos, min(chunk, self.size - pos)))
+        return self._tag_matches(mac)
+
+    def readinto(self, b) -> int:
+        self._checkClosed()
+        view = memoryview(b).cast("B")
+        n = min(len(view), self.size - self._pos)
+        if n <= 0:
+            self._follow_mac(b"")
+            return 0
+        data = self._raw(self._pos, n)
+        self._follow_mac(data)
+        if self._cipher is not None:
+            self._cipher.seek(self._pos)
+            data = self._cipher.decrypt(data)
+        view[:n] = data
+        self._pos += n
+        return n
+
+    def _close_source(self):
+        if hasattr(self._src, "close"):
+            self._src.close()
+
+    def close(self):
+        if not self.closed:
+            self._close_source()
+        super().close()
+
+class StegoWriter(io.RawIOBase):
+    """Write-only file object that embeds a secret into a cover as it arrives.
+
+    Every ``write`` encrypts the chunk (when ``encrypt`` is set) at its key
+    phase and embeds it straight into the output samples, so the secret never
+    has to exist as a file or as one buffer. Only the v2 preamble depends on
+    the total length; it sits in its own samples and is written on ``close``.
+    WAV covers are cloned to ``out_path`` and patched through a memory map;
+    other covers are decoded and the stego WAV is encoded on close.
+
+    With ``mac`` the authentication tag is computed over the chunks as they
+    are written and appended on ``close``.
+
+    Leaving a ``with`` block through an exception removes the partial output.
+    After ``close``, ``out_path`` is the WAV written and ``psnr`` its PSNR
+    (None unless ``compute_psnr``).
+    """
+
+    def __init__(self, cover_path: str, out_path: str, key: str, n_lsb: int,
+                 name: str = "secret", ext: str = "", encrypt: bool = False,
+                 use_rand_start: bool = False, compute_psnr: bool = True,
+                 cipher: str = "vigenere", mac: bool = False):
+        super().__init__()
+        if n_lsb < 1 or n_lsb > 4:
+            raise ValueError("n_lsb must be 1..4")
+        cover_path = str(cover_path)
+        self.out_path = _stego_out_path(str(out_path))
+        self.psnr = None
+        self._n_lsb = n_lsb
+        self._flags = (_cipher_flags(encrypt, cipher) | (FLAG_RND if use_rand_start else 0)
+                       | (FLAG_MAC if mac else 0))
+        self._compute_psnr = compute_psnr
+        # Chunks are embedded in whole symbols; this many bytes always end on one.
+        self._align = n_lsb // math.gcd(8, n_lsb)
+        nonce = os.urandom(_nonce_len(self._flags))
+        self._pending = bytearray(build_name_record(name, ext) + nonce)
+        self._blob_len = 0
+        self._cipher = _body_cipher(self._flags, key, nonce)
+        self._tag_len = _tag_len(self._flags)
+        self._mac = _container_mac(key) if mac else None
+        if self._mac is not None:
+            self._mac.update(self._pending)
+        self._sse = 0
+        self._created = False
+
+        info = _streamable_wav(cover_path, self.out_path)
+        if info is not None:
+            from .wavio import clone_file, map_pcm16_data
+            self._wav = None
+            clone_file(cover_path, self.out_path)
+            self._created = True
+            try:
+                self._samples = map_pcm16_data(self.out_path, info, writable=True)
+            except BaseException:
+                self._discard()
+                raise
+        else:
+            import numpy as np
+            cover, channels, frame_rate, _ = _decode_to_samples(cover_path)
+            self._wav = (channels, frame_rate)
+            self._samples = np.array(cover, copy=True)
+        self._region = self._samples.size - _PREAMBLE_SAMPLES
+        if self._region <= 0:
+            self._discard()
+            raise CapacityError("Cover audio terlalu pendek untuk menampung header.")
+        seed = seed_from_key(key) if use_rand_start else 0
+        self._start = start_index_from_seed(self._region, seed)
+
+    def _patch(self, lo: int, hi: int, data, n_lsb: int, g0: int):
+        """Write symbols ``[g0, g0 + hi - lo)`` of ``data`` into samples
+        ``[lo, hi)`` and add the change to the squared error."""
+        import numpy as np
+        seg = self._samples[lo:hi]
+        orig = np.array(seg)
+        work = orig.copy()
+        _write_symbols(work, data, n_lsb, g0, g0 + (hi - lo))
+        seg[:] = work
+        d = work.astype(np.int64) - orig
+        self._sse += int(np.dot(d, d))
+
+    def _embed(self, data):
+        """Embed ``data`` at blob offset ``_blob_len``, which is symbol aligned."""
+        n_lsb = self._n_lsb
+        g0 = self._blob_len * 8 // n_lsb
+        g1 = g0 + -(-len(data) * 8 // n_lsb)
+        for lo, hi, slot in _wrap_runs(self._region, self._start, g0, g1):
+            p = _PREAMBLE_SAMPLES + slot
+            self._patch(p, p + (hi - lo), data, n_lsb, lo - g0)
+        self._blob_len += len(data)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._checkClosed()
+        data = memoryview(b).cast("B")
+        n = len(data)
+        total = self._blob_len + len(self._pending) + n + self._tag_len
+        if total * 8 > self._region * self._n_lsb:
+            raise _write_deficit_error(total * 8, self._region * self._n_lsb)
+        if self._cipher is not None:
+            data = self._cipher.encrypt(data)
+        if self._mac is not None:
+            self._mac.update(data)
+        self._pending += data
+        k = len(self._pending) - len(self._pending) % self._align
+        if k:
+            self._embed(self._pending[:k])
+            del self._pending[:k]
+        return n
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            preamble = build_preamble(self._n_lsb, self._flags,
+                                      self._blob_len + len(self._pending) + self._tag_len)
+            if self._mac is not None:
+                self._mac.update(preamble)
+                self._pending += self._mac.digest()
+            if self._pending:
+                self._embed(bytes(self._pending))
+                self._pending.clear()
+            self._patch(0, _PREAMBLE_SAMPLES, preamble, 1, 0)
+            if self._wav is None:
+                self._samples.flush()
+            else:
+                channels, frame_rate = self._wav
+                _encode_samples_to_wav(self._samples, channels, frame_rate, self.out_path)
+                self._created = True
+                decoded_audio_cache.store(self.out_path, (self._samples, channels, frame_rate, 2))
+            if self._compute_psnr:
+                self.psnr = psnr_from_sse(self._sse, self._samples.size)
+        except BaseException:
+            self._discard()
+            raise
+        finally:
+            self._samples = None
+            super().close()
+
+    def _discard(self):
+        self._samples = None
+        if self._created:
+            try:
+                os.remove(self.out_path)
+            except OSError:
+                pass
+
+    def abort(self):
+        """Stop without finishing the stego file and remove what was written."""
+        if not self.closed:
+            self._discard()
+            super().close()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
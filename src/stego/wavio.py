@@ -0,0 +1,175 @@
+import os
+import struct
+from dataclasses import dataclass
+
+WAVE_FORMAT_PCM = 1
+
+@dataclass
+class WavInfo:
+    channels: int
+    samplerate: int
+    sample_width: int
+    format_tag: int
+    data_offset: int    # absolute byte offset of the first sample
+    data_size: int      # byte length declared by the data chunk
+    file_size: int
+
+    @property
+    def frame_size(self) -> int:
+        return self.channels * self.sample_width
+
+    @property
+    def total_frames(self) -> int:
+        return self.data_size // self.frame_size if self.frame_size else 0
+
+    @property
+    def total_samples(self) -> int:
+        return self.total_frames * self.channels
+
+    @property
+    def is_pcm16(self) -> bool:
+        return self.format_tag == WAVE_FORMAT_PCM and self.sample_width == 2 and self.channels > 0
+
+    @property
+    def complete(self) -> bool:
+        """True when the file really holds every byte the data chunk declares."""
+        return self.data_offset + self.data_size <= self.file_size
+
+def parse_wav_header(f, file_size: int) -> WavInfo:
+    """Walk the RIFF chunks of an open binary file up to the ``data`` chunk.
+
+    Only chunk headers and the ``fmt `` body are read; sample data is never
+    touched. Raises ValueError if the file is not a RIFF/WAVE file or the
+    chunk layout is one the stdlib ``wave`` module would reject.
+    """
+    f.seek(0)
+    riff = f.read(12)
+    if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE file")
+    fmt = None
+    pos = 12
+    while True:
+        head = f.read(8)
+        if len(head) < 8:
+            raise ValueError("No data chunk")
+        cid, size = struct.unpack("<4sI", head)
+        body = pos + 8
+        if cid == b"fmt ":
+            raw = f.read(min(size, 16))
+            if len(raw) < 16:
+                raise ValueError("fmt chunk too small")
+            fmt = struct.unpack("<HHIIHH", raw)
+        elif cid == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            tag, channels, rate, _byte_rate, _block_align, bits = fmt
+            return WavInfo(channels, rate, (bits + 7) // 8, tag, body, size, file_size)
+        pos = body + size + (size & 1)
+        f.seek(pos)
+
+def read_wav_info(path: str) -> WavInfo:
+    with open(path, "rb") as f:
+        return parse_wav_header(f, os.fstat(f.fileno()).st_size)
+
+def iter_pcm16_blocks(path: str, block_samples: int, info: WavInfo = None):
+    """Yield the samples of a 16-bit PCM WAV as int16 arrays of ``block_samples``
+    (the last one may be shorter), reading one block at a time."""
+    import numpy as np
+    with open(path, "rb") as f:
+        if info is None:
+            info = parse_wav_header(f, os.fstat(f.fileno()).st_size)
+        if not info.is_pcm16:
+            raise ValueError("Not a 16-bit PCM WAV")
+        remaining = info.total_samples
+        f.seek(info.data_offset)
+        while remaining > 0:
+            raw = f.read(min(block_samples, remaining) * 2)
+            if len(raw) < 2:
+                break
+            block = np.frombuffer(raw[:len(raw) & ~1], dtype="<i2")
+            remaining -= block.size
+            yield block
+
+def map_pcm16_data(path: str, info: WavInfo, writable: bool = False):
+    """Memory-map the samples of a 16-bit PCM WAV as an int16 array."""
+    import numpy as np
+    if not info.is_pcm16:
+        raise ValueError("Not a 16-bit PCM WAV")
+    return np.memmap(path, dtype="<i2", mode="r+" if writable else "r",
+                     offset=info.data_offset, shape=(info.total_samples,))
+
+# Linux FICLONE ioctl: share extents with the source (btrfs, XFS, bcachefs...).
+_FICLONE = 0x40049409
+
+def clone_file(src: str, dst: str):
+    """Copy ``src`` to ``dst`` without moving the bytes through Python.
+
+    Tries a reflink first, then ``copy_file_range`` and ``sendfile``, and only
+    falls back to a buffered copy when the kernel offers none of them.
+    """
+    import shutil
+    with open(src, "rb") as fi, open(dst, "wb") as fo:
+        try:
+            import fcntl
+            fcntl.ioctl(fo.fileno(), _FICLONE, fi.fileno())
+            return
+        except (ImportError, OSError):
+            pass
+        size = os.fstat(fi.fileno()).st_size
+        for copy in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+            if copy is None:
+                continue
+            try:
+                done = fo.tell()
+                while done < size:
+                    if copy is os.sendfile:
+                        n = copy(fo.fileno(), fi.fileno(), done, size - done)
+                    else:
+                        n = copy(fi.fileno(), fo.fileno(), size - done, done, done)
+                    if n == 0:
+                        break
+                    done += n
+                if done == size:
+                    return
+                fo.seek(done)
+            except OSError:
+                fo.seek(0)
+                fo.truncate()
+        fi.seek(fo.tell())
+        shutil.copyfileobj(fi, fo)
+
+class PCM16File:
+    """Random read access to the samples of a 16-bit PCM WAV.
+
+    ``read(lo, hi)`` seeks to sample ``lo`` and reads samples ``[lo, hi)``,
+    so callers only ever pull in the sample ranges they ask for.
+    """
+
+    def __init__(self, path: str, info: WavInfo = None):
+        self._f = open(path, "rb")
+        try:
+            self.info = info or parse_wav_header(self._f, os.fstat(self._f.fileno()).st_size)
+            if not self.info.is_pcm16:
+                raise ValueError("Not a 16-bit PCM WAV")
+        except Exception:
+            self._f.close()
+            raise
+        self.size = self.info.total_samples
+
+    def read(self, lo: int, hi: int):
+        import numpy as np
+        lo = max(0, lo); hi = min(self.size, hi)
+        if hi <= lo:
+            return np.zeros(0, dtype=np.int16)
+        self._f.seek(self.info.data_offset + lo * 2)
+        raw = self._f.read((hi - lo) * 2)
+        return np.frombuffer(raw[:len(raw) & ~1], dtype="<i2")
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
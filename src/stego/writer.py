@@ -1,31 +1,34 @@
+import itertools
+import numpy as np
 from .mp3stream import MP3Stream
 from .seed import start_index_from_seed
-from .bitops import bits_from_bytes
+from .bitops import bits_to_symbols
 from typing import Iterable
 
 def embed_bits_into_padding(mp3_bytes: bytes, bitstream: Iterable[int], n_lsb: int, start_seed_index: int) -> bytes:
-    """Embed bits into the LSBs of each padding byte, starting at a seed-based index."""
+    """Embed bits into the LSBs of each padding byte, starting at a seed-based index.
+
+    Every padding slot is rewritten once; slots past the end of ``bitstream``
+    get zero bits. ``bitstream`` may be any iterable of bits or a bit array.
+    """
     st = MP3Stream(mp3_bytes)
-    positions = list(st.iter_padding_slots())
-    total_slots = len(positions)
+    positions = st.padding_slots()
+    total_slots = positions.size
     if total_slots == 0:
         raise ValueError("No padding bytes present; try another MP3 (CBR/320k recommended).")
     start = start_seed_index % total_slots
-    order = positions[start:] + positions[:start]
+    order = np.roll(positions, -start)
 
-    out = bytearray(mp3_bytes)
-    bit_iter = iter(bitstream)
+    cap = total_slots * n_lsb
+    if isinstance(bitstream, np.ndarray):
+        bits = bitstream[:cap]
+    else:
+        bits = np.fromiter(itertools.islice(bitstream, cap), dtype=np.int64)
+    symbols = np.zeros(total_slots, dtype=np.uint8)
+    sym = bits_to_symbols(bits & 1, n_lsb)
+    symbols[:sym.size] = sym
 
-    for off in order:
-        bits = []
-        for _ in range(n_lsb):
-            try:
-                bits.append(next(bit_iter))
-            except StopIteration:
-                bits.append(0)
-        b = out[off]
-        for j, bit in enumerate(bits):
-            mask = 1 << j
-            b = (b & ~mask) | ((bit & 1) << j)
-        out[off] = b
-    return bytes(out)
+    out = np.frombuffer(bytearray(mp3_bytes), dtype=np.uint8)
+    keep = np.uint8(0xFF & ~((1 << n_lsb) - 1))
+    out[order] = (out[order] & keep) | symbols
+    return out.tobytes()
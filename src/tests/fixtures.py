@@ -0,0 +1,16 @@
+"""Shared test fixtures."""
+import wave
+
+import numpy as np
+
+
+def gen_noise_wav(path: str, n_samples: int, channels: int = 1, fr: int = 8000, seed: int = 0):
+    """Generate a WAV file of ``n_samples`` random 16-bit samples (all
+    channels together) for testing."""
+    rng = np.random.default_rng(seed)
+    pcm = rng.integers(-20000, 20000, size=n_samples, dtype=np.int16)
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(fr)
+        wf.writeframes(pcm.astype('<i2').tobytes())
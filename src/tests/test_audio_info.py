@@ -0,0 +1,131 @@
+import os
+import sys
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path for imports
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from fixtures import gen_noise_wav
+from stego.audiocache import decoded_audio_cache
+from stego.mp3stream import MP3Stream
+from stego.pipeline import (
+    _decode_uncached,
+    _mp3_pcm_info,
+    _probe_audio_info,
+    analyze_cover_file,
+    compute_capacity_for_file,
+)
+from stego.wavio import read_wav_info
+
+
+def _gen_noise_wav(path: str, n_frames: int, channels: int = 1, fr: int = 8000):
+    gen_noise_wav(path, n_frames * channels, channels, fr, seed=n_frames)
+
+
+def _riff(*chunks):
+    body = b"WAVE" + b"".join(cid + struct.pack("<I", len(data)) + data + (b"\0" if len(data) & 1 else b"")
+                              for cid, data in chunks)
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _fmt(channels=2, rate=22050, bits=16, tag=1):
+    align = channels * ((bits + 7) // 8)
+    return struct.pack("<HHIIHH", tag, channels, rate, rate * align, align, bits)
+
+
+def _mp3_frame(pad: int = 0, mono: bool = False, body: bytes = b""):
+    """One MPEG-1 Layer III frame header (128 kbps, 44.1 kHz) plus zero fill."""
+    size = 144 * 128000 // 44100 + pad
+    head = bytes([0xFF, 0xFB, (0b1001 << 4) | (pad << 1), (0b11 if mono else 0b00) << 6])
+    return (head + body).ljust(size, b"\0")
+
+
+class TestWavHeaderFastPath(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_matches_full_decode(self):
+        for channels, n_frames in ((1, 4000), (2, 1234)):
+            with self.subTest(channels=channels):
+                path = self._path(f'c{channels}.wav')
+                _gen_noise_wav(path, n_frames, channels)
+                samples, ch, fr, sw = _decode_uncached(path)
+                self.assertEqual(_probe_audio_info(path), (samples.size, ch, fr, sw))
+
+    def test_extra_chunks_are_skipped(self):
+        path = self._path('list.wav')
+        data = np.arange(-50, 51, dtype='<i2').tobytes()
+        Path(path).write_bytes(_riff((b"fmt ", _fmt(channels=1)), (b"LIST", b"INFOabc"), (b"data", data)))
+        info = read_wav_info(path)
+        self.assertEqual(info.total_samples, 101)
+        self.assertEqual(_probe_audio_info(path), (101, 1, 22050, 2))
+        self.assertEqual(_decode_uncached(path)[0].size, 101)
+
+    def test_ambiguous_headers_fall_back(self):
+        truncated = self._path('trunc.wav')
+        Path(truncated).write_bytes(_riff((b"fmt ", _fmt()), (b"data", b"\0" * 400))[:-100])
+        eight_bit = self._path('u8.wav')
+        Path(eight_bit).write_bytes(_riff((b"fmt ", _fmt(bits=8)), (b"data", b"\x80" * 400)))
+        for path in (truncated, eight_bit):
+            with self.subTest(path=os.path.basename(path)):
+                self.assertIsNone(_probe_audio_info(path))
+
+    def test_capacity_and_analyze_do_not_decode(self):
+        path = self._path('cover.wav')
+        _gen_noise_wav(path, 3000, channels=2)
+        decoded_audio_cache.clear()
+        before = decoded_audio_cache.stats()["misses"]
+        self.assertEqual(compute_capacity_for_file(path, 3), 6000 * 3)
+        info = analyze_cover_file(path)
+        self.assertEqual(decoded_audio_cache.stats()["misses"], before)
+        self.assertEqual(info["total_samples"], 6000)
+        self.assertEqual(info["total_frames"], 3000)
+        self.assertTrue(info["stereo"])
+        self.assertAlmostEqual(info["duration_sec"], 3000 / 8000)
+
+
+class TestMp3HeaderFastPath(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'x.mp3')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_plain_frames(self):
+        Path(self.path).write_bytes(b"".join(_mp3_frame(pad=i % 2) for i in range(10)))
+        self.assertEqual(_mp3_pcm_info(self.path), (10 * 1152 * 2, 2, 44100, 2))
+
+    def test_xing_lame_gapless_trim(self):
+        xing = b"Info" + struct.pack(">II", 1, 9)            # frames field only
+        lame = b"LAME3.100" + b"\0" * 12 + ((576 << 12) | 1000).to_bytes(3, "big")
+        tag_frame = _mp3_frame(mono=True, body=b"\0" * 17 + xing + lame)
+        Path(self.path).write_bytes(tag_frame + b"".join(_mp3_frame(mono=True) for _ in range(9)))
+        tag = MP3Stream(Path(self.path).read_bytes()).info_tag()
+        self.assertEqual(tag["kind"], "Info")
+        self.assertEqual((tag["encoder_delay"], tag["encoder_padding"]), (576, 1000))
+        self.assertEqual(_mp3_pcm_info(self.path), (9 * 1152 - 1576, 1, 44100, 2))
+
+    def test_inconsistent_tag_falls_back(self):
+        xing = b"Xing" + struct.pack(">II", 1, 50)
+        Path(self.path).write_bytes(_mp3_frame(body=b"\0" * 32 + xing) + _mp3_frame() * 3)
+        self.assertIsNone(_mp3_pcm_info(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,88 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path for imports
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from fixtures import gen_noise_wav
+from stego.audiocache import DecodedAudioCache, decoded_audio_cache
+from stego.pipeline import embed_to_file, extract_to_file, check_embed_feasibility
+
+
+def _fake_decode(calls):
+    def decode(path):
+        calls.append(path)
+        return (np.zeros(Path(path).stat().st_size, dtype=np.int16), 1, 8000, 2)
+    return decode
+
+
+class TestDecodedAudioCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.a = os.path.join(self.tmpdir.name, 'a.bin')
+        self.b = os.path.join(self.tmpdir.name, 'b.bin')
+        Path(self.a).write_bytes(b'x' * 100)
+        Path(self.b).write_bytes(b'y' * 100)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_hits_and_misses(self):
+        cache = DecodedAudioCache()
+        calls = []
+        first = cache.get_or_decode(self.a, _fake_decode(calls))
+        second = cache.get_or_decode(self.a, _fake_decode(calls))
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertFalse(first[0].flags.writeable)
+
+    def test_modified_file_is_redecoded(self):
+        cache = DecodedAudioCache()
+        calls = []
+        cache.get_or_decode(self.a, _fake_decode(calls))
+        Path(self.a).write_bytes(b'x' * 50)
+        value = cache.get_or_decode(self.a, _fake_decode(calls))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(value[0].size, 50)
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    def test_byte_budget_evicts_least_recent(self):
+        cache = DecodedAudioCache(max_bytes=300)  # room for one 200-byte entry
+        calls = []
+        cache.get_or_decode(self.a, _fake_decode(calls))
+        cache.get_or_decode(self.b, _fake_decode(calls))
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertLessEqual(stats["bytes"], 300)
+        cache.get_or_decode(self.b, _fake_decode(calls))
+        self.assertEqual(len(calls), 2)
+
+    def test_pipeline_decodes_cover_once(self):
+        cover = os.path.join(self.tmpdir.name, 'cover.wav')
+        gen_noise_wav(cover, 4000)
+        secret = os.path.join(self.tmpdir.name, 'secret.txt')
+        Path(secret).write_text("cache me")
+        out = os.path.join(self.tmpdir.name, 'stego.wav')
+
+        decoded_audio_cache.clear()
+        before = decoded_audio_cache.stats()
+        check_embed_feasibility(cover, secret, 'k', 2)
+        embed_to_file(cover, secret, out, 'k', 2, False, True, compute_psnr=True, streaming=False)
+        extract_to_file(out, 'k', self.tmpdir.name)
+        after = decoded_audio_cache.stats()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,121 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path for imports
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from stego.bitops import (
+    bits_from_bytes, bits_to_symbols, bytes_from_bits, bytes_to_symbols,
+    pack_bits, symbols_to_bits, symbols_to_bytes, unpack_bits,
+)
+from stego.mp3stream import MP3Stream
+from stego.reader import extract_bits_from_padding
+from stego.writer import embed_bits_into_padding
+
+
+def _ref_bits(data: bytes):
+    """The original per-bit generator."""
+    for b in data:
+        for i in range(7, -1, -1):
+            yield (b >> i) & 1
+
+
+def _ref_bytes(bits):
+    """The original per-bit packer."""
+    out = bytearray()
+    cur = 0; cnt = 0
+    for bit in bits:
+        cur = (cur << 1) | (bit & 1)
+        cnt += 1
+        if cnt == 8:
+            out.append(cur); cur = 0; cnt = 0
+    if cnt:
+        out.append(cur << (8 - cnt))
+    return bytes(out)
+
+
+def _ref_embed(mp3_bytes, bitstream, n_lsb, start_seed_index):
+    """The original slot-by-slot padding writer."""
+    positions = list(MP3Stream(mp3_bytes).iter_padding_slots())
+    start = start_seed_index % len(positions)
+    out = bytearray(mp3_bytes)
+    bit_iter = iter(bitstream)
+    for off in positions[start:] + positions[:start]:
+        b = out[off]
+        for j in range(n_lsb):
+            bit = next(bit_iter, 0)
+            b = (b & ~(1 << j)) | ((bit & 1) << j)
+        out[off] = b
+    return bytes(out)
+
+
+def _mp3_frame(pad: int, fill: int):
+    size = 144 * 128000 // 44100 + pad
+    head = bytes([0xFF, 0xFB, (0b1001 << 4) | (pad << 1), 0])
+    return head + bytes([fill]) * (size - 4)
+
+
+class TestBitArrays(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.random.default_rng(3).integers(0, 256, size=1001, dtype=np.uint8).tobytes()
+
+    def test_generator_api_unchanged(self):
+        bits = list(bits_from_bytes(self.data))
+        self.assertEqual(bits, list(_ref_bits(self.data)))
+        for n in (0, 1, 7, 8, 13, len(bits)):
+            with self.subTest(n=n):
+                self.assertEqual(bytes_from_bits(iter(bits[:n])), _ref_bytes(bits[:n]))
+        self.assertEqual(bytes_from_bits([3, 2, 5]), _ref_bytes([3, 2, 5]))
+
+    def test_bit_orders(self):
+        big = unpack_bits(self.data)
+        little = unpack_bits(self.data, bitorder="little")
+        np.testing.assert_array_equal(little.reshape(-1, 8), big.reshape(-1, 8)[:, ::-1])
+        self.assertEqual(pack_bits(big), self.data)
+        self.assertEqual(pack_bits(little, bitorder="little"), self.data)
+
+    def test_symbols_round_trip(self):
+        bits = unpack_bits(self.data)
+        for n_lsb in (1, 2, 3, 4):
+            with self.subTest(n_lsb=n_lsb):
+                sym = bytes_to_symbols(self.data, n_lsb)
+                self.assertEqual(sym.size, -(-bits.size // n_lsb))
+                for g in (0, 1, sym.size - 1):
+                    group = bits[g * n_lsb:(g + 1) * n_lsb]
+                    self.assertEqual(int(sym[g]), sum(int(b) << j for j, b in enumerate(group)))
+                np.testing.assert_array_equal(symbols_to_bits(sym, n_lsb)[:bits.size], bits)
+                self.assertEqual(symbols_to_bytes(sym, n_lsb, nbits=bits.size), self.data)
+                np.testing.assert_array_equal(bits_to_symbols(symbols_to_bits(sym | 0xF0, n_lsb), n_lsb), sym)
+
+
+class TestPaddingWriterReader(unittest.TestCase):
+
+    def setUp(self):
+        self.mp3 = b"".join(_mp3_frame(pad=int(i % 3 != 0), fill=i & 0xFF) for i in range(60))
+        self.payload = bytes(range(7, 37))
+
+    def test_matches_original_loops(self):
+        for n_lsb in (1, 3, 4):
+            for bits in (list(_ref_bits(self.payload)), list(_ref_bits(self.payload))[:5]):
+                with self.subTest(n_lsb=n_lsb, nbits=len(bits)):
+                    expected = _ref_embed(self.mp3, bits, n_lsb, 17)
+                    self.assertEqual(embed_bits_into_padding(self.mp3, iter(bits), n_lsb, 17), expected)
+                    self.assertEqual(embed_bits_into_padding(self.mp3, np.array(bits, dtype=np.uint8), n_lsb, 17), expected)
+
+    def test_round_trip(self):
+        for n_lsb in (1, 2, 3, 4):
+            with self.subTest(n_lsb=n_lsb):
+                nbits = min(len(self.payload) * 8, 40 * n_lsb)
+                stego = embed_bits_into_padding(self.mp3, bits_from_bytes(self.payload), n_lsb, 5)
+                self.assertEqual(extract_bits_from_padding(stego, nbits, n_lsb, 5),
+                                 _ref_bytes(list(_ref_bits(self.payload))[:nbits]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
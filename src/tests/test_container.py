@@ -0,0 +1,356 @@
+import os
+import sys
+import struct
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path for imports
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from fixtures import gen_noise_wav
+from stego.meta import (
+    PREAMBLE_LEN, FLAG_ENC, FLAG_RND, FLAG_STREAM, STREAM_NONCE_LEN, TAG_LEN,
+    build_preamble, parse_preamble, build_name_record, parse_name_record,
+)
+from stego.pipeline import (
+    _build_header,
+    _decode_to_samples,
+    _embed_bits_into_samples,
+    _encode_samples_to_wav,
+    _extract_bits_from_samples,
+    _Payload,
+    _psnr_paths_generic,
+    embed_to_file,
+    extract_to_file,
+)
+from stego.crypto import Vigenere256, mac_hasher, vigenere256_encrypt
+from stego.seed import seed_from_key, start_index_from_seed
+
+
+class TestPreamble(unittest.TestCase):
+    """v2 preamble encoding and validation."""
+
+    def test_round_trip(self):
+        raw = build_preamble(3, FLAG_ENC | FLAG_RND, 2**40 + 5)
+        self.assertEqual(len(raw), PREAMBLE_LEN)
+        pre = parse_preamble(raw)
+        self.assertEqual(pre, {"ver": 2, "n_lsb": 3, "flags": FLAG_ENC | FLAG_RND, "length": 2**40 + 5})
+
+    def test_rejects_corruption(self):
+        raw = bytearray(build_preamble(2, 0, 1234))
+        for pos in (0, 4, 5, 7, 10, PREAMBLE_LEN - 1):
+            with self.subTest(pos=pos):
+                bad = bytearray(raw)
+                bad[pos] ^= 0x01
+                with self.assertRaises(ValueError):
+                    parse_preamble(bytes(bad))
+        with self.assertRaises(ValueError):
+            parse_preamble(bytes(raw[:-1]))
+
+    def test_rejects_out_of_range_fields(self):
+        for n_lsb, flags in ((0, 0), (5, 0), (2, 0x80), (2, FLAG_STREAM)):
+            with self.subTest(n_lsb=n_lsb, flags=flags):
+                with self.assertRaises(ValueError):
+                    parse_preamble(build_preamble(n_lsb, flags, 10))
+
+    def test_name_record(self):
+        rec = build_name_record("résumé", ".tar.gz")
+        self.assertEqual(parse_name_record(rec + b"body"), ("résumé", ".tar.gz", len(rec)))
+        with self.assertRaises(ValueError):
+            parse_name_record(rec[:-1])
+
+
+class TestPayloadSegments(unittest.TestCase):
+    """A segmented payload must read exactly like its parts joined."""
+
+    def test_windows_match_joined_bytes(self):
+        head, body, tail = b"\x00\x05hello", bytes(range(256)) * 2, b"xyz"
+        key = b"segkey"
+        payload = _Payload(head, (body, Vigenere256(key)), tail)
+        joined = head + vigenere256_encrypt(body, key) + tail
+        self.assertEqual(len(payload), len(joined))
+        for b0 in (0, 3, 7, 100, 518, 520):
+            for b1 in (b0, b0 + 1, b0 + 9, len(joined)):
+                with self.subTest(b0=b0, b1=b1):
+                    self.assertEqual(bytes(payload.window(b0, b1)), joined[b0:b1])
+
+    def test_embed_matches_joined_bytes(self):
+        rng = np.random.default_rng(2)
+        cover = rng.integers(-20000, 20000, size=5000, dtype=np.int16)
+        head, body = b"\x00\x01ab", rng.integers(0, 256, size=1500, dtype=np.uint8).tobytes()
+        for n_lsb in (1, 3, 4):
+            with self.subTest(n_lsb=n_lsb):
+                a, b = cover.copy(), cover.copy()
+                _embed_bits_into_samples(a, _Payload(head, (body, Vigenere256(b"k"))), n_lsb, 123)
+                _embed_bits_into_samples(b, head + vigenere256_encrypt(body, b"k"), n_lsb, 123)
+                np.testing.assert_array_equal(a, b)
+
+    def test_feed_matches_joined_bytes(self):
+        head, body, tail = b"\x00\x05hello", bytes(range(256)) * 2, b"xyz"
+        key = b"segkey"
+        payload = _Payload(head, (body, Vigenere256(key)), tail)
+        joined = head + vigenere256_encrypt(body, key) + tail
+        fed = []
+        payload.feed(lambda b: fed.append(bytes(b)))
+        self.assertEqual(b"".join(fed), joined)
+        # Windows read after the pass still see the same ciphertext.
+        self.assertEqual(bytes(payload.window(3, len(joined))), joined[3:])
+        payload.release()
+
+    def test_mac_embed_writes_no_spool_file(self):
+        with tempfile.TemporaryDirectory() as d:
+            cover = os.path.join(d, 'cover.wav')
+            gen_noise_wav(cover, 20000)
+            secret_bytes = np.random.default_rng(5).integers(0, 256, size=3000, dtype=np.uint8).tobytes()
+            secret = os.path.join(d, 'secret.bin')
+            Path(secret).write_bytes(secret_bytes)
+            out = os.path.join(d, 'stego.wav')
+            no_files = AssertionError("payload spooled to a file")
+            with unittest.mock.patch("tempfile.TemporaryFile", side_effect=no_files), \
+                    unittest.mock.patch("tempfile.NamedTemporaryFile", side_effect=no_files), \
+                    unittest.mock.patch("tempfile.mkstemp", side_effect=no_files):
+                embed_to_file(cover, secret, out, 'k', 2, True, True, mac=True)
+            self.assertEqual(sorted(os.listdir(d)), ['cover.wav', 'secret.bin', 'stego.wav'])
+
+            # The tag covers the ciphertext blob followed by the preamble.
+            samples = np.array(_decode_to_samples(out)[0])
+            pre = parse_preamble(_extract_bits_from_samples(samples[:PREAMBLE_LEN * 8], PREAMBLE_LEN * 8, 1, 0))
+            region = samples[PREAMBLE_LEN * 8:]
+            start = start_index_from_seed(region.size, seed_from_key('k'))
+            blob = _extract_bits_from_samples(region, pre["length"] * 8, 2, start)
+            h = mac_hasher(b'k')
+            h.update(blob[:-TAG_LEN])
+            h.update(build_preamble(2, pre["flags"], pre["length"]))
+            self.assertEqual(blob[-TAG_LEN:], h.digest())
+            outdir = os.path.join(d, 'out')
+            os.makedirs(outdir)
+            extract_to_file(out, 'k', outdir)
+            self.assertEqual(Path(outdir, 'secret.bin').read_bytes(), secret_bytes)
+
+    def test_empty_secret_round_trip(self):
+        with tempfile.TemporaryDirectory() as d:
+            cover = os.path.join(d, 'cover.wav')
+            gen_noise_wav(cover, 3000)
+            secret = os.path.join(d, 'empty.txt')
+            Path(secret).write_bytes(b"")
+            out = os.path.join(d, 'stego.wav')
+            embed_to_file(cover, secret, out, 'k', 2, True, True)
+            outdir = os.path.join(d, 'out')
+            os.makedirs(outdir)
+            extract_to_file(out, 'k', outdir)
+            self.assertEqual(Path(outdir, 'empty.txt').read_bytes(), b"")
+
+
+class TestContainerLayout(unittest.TestCase):
+    """Embedding writes v2; extraction still reads v1."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cover = os.path.join(self.tmpdir.name, 'cover.wav')
+        gen_noise_wav(self.cover, 6000)
+        self.secret = os.path.join(self.tmpdir.name, 'note.txt')
+        Path(self.secret).write_bytes(b"the quick brown fox " * 10)
+        self.outdir = os.path.join(self.tmpdir.name, 'out')
+        os.makedirs(self.outdir)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_preamble_at_one_lsb_from_sample_zero(self):
+        for n_lsb in (1, 4):
+            for rnd in (False, True):
+                with self.subTest(n_lsb=n_lsb, rnd=rnd):
+                    out = os.path.join(self.tmpdir.name, f'stego_{n_lsb}_{rnd}.wav')
+                    embed_to_file(self.cover, self.secret, out, 'k', n_lsb, encrypt=True,
+                                  use_rand_start=rnd, compute_psnr=False)
+                    samples = _decode_to_samples(out)[0]
+                    raw = _extract_bits_from_samples(samples, PREAMBLE_LEN * 8, 1, 0)
+                    pre = parse_preamble(raw)
+                    self.assertEqual(pre["n_lsb"], n_lsb)
+                    self.assertEqual(pre["flags"], FLAG_ENC | (FLAG_RND if rnd else 0))
+                    path, flags = extract_to_file(out, 'k', self.outdir)
+                    self.assertEqual(Path(path).read_bytes(), Path(self.secret).read_bytes())
+                    self.assertEqual(flags, {"encrypted": True, "randomized": rnd, "n_lsb": n_lsb})
+
+    def test_payload_size_from_metadata(self):
+        from stego.pipeline import calculate_payload_size, _container_bits
+        secret = os.path.join(self.tmpdir.name, 'report.tar.gz')
+        data = bytes(range(256)) * 5
+        Path(secret).write_bytes(data)
+        blob_len = len(build_name_record('report.tar', '.tar.gz') + vigenere256_encrypt(data, b'k'))
+        for n_lsb in (1, 2, 3, 4):
+            for encrypt in (False, True):
+                with self.subTest(n_lsb=n_lsb, encrypt=encrypt):
+                    self.assertEqual(calculate_payload_size(secret, 'k', n_lsb, encrypt, True),
+                                     _container_bits(blob_len, n_lsb))
+        self.assertEqual(calculate_payload_size(secret, 'k', 2, True, True, cipher="shake256"),
+                         _container_bits(blob_len + STREAM_NONCE_LEN, 2))
+        self.assertEqual(calculate_payload_size(secret, 'k', 2, False, True, mac=True),
+                         _container_bits(blob_len + TAG_LEN, 2))
+
+    def test_reads_legacy_v1_files(self):
+        body = Path(self.secret).read_bytes()
+        samples = np.array(_decode_to_samples(self.cover)[0], copy=True)
+        blob = _build_header(False, True, 2, len(body), "note", ".txt") + body
+        start = seed_from_key('legacy') % samples.size
+        _embed_bits_into_samples(samples, struct.pack(">I", len(blob)) + blob, 2, start)
+        out = os.path.join(self.tmpdir.name, 'legacy.wav')
+        _encode_samples_to_wav(samples, 1, 8000, out)
+
+        path, flags = extract_to_file(out, 'legacy', self.outdir)
+        self.assertEqual(Path(path).read_bytes(), body)
+        self.assertEqual(flags, {"encrypted": False, "randomized": True, "n_lsb": 2})
+
+
+class TestEmbedPsnr(unittest.TestCase):
+    """PSNR computed from the in-memory arrays must match a full comparison."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cover = os.path.join(self.tmpdir.name, 'cover.wav')
+        gen_noise_wav(self.cover, 5000, seed=7)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_matches_full_comparison(self):
+        secret = os.path.join(self.tmpdir.name, 'blob.bin')
+        Path(secret).write_bytes(bytes(range(256)) * 2)
+        for n_lsb in (1, 2, 4):
+            with self.subTest(n_lsb=n_lsb):
+                out = os.path.join(self.tmpdir.name, f'stego{n_lsb}.wav')
+                psnr = embed_to_file(self.cover, secret, out, 'wrap', n_lsb, False, True)
+                self.assertAlmostEqual(psnr, _psnr_paths_generic(self.cover, out), places=9)
+
+
+class TestStreamingEmbed(unittest.TestCase):
+    """The block-by-block WAV embed must produce the in-memory path's output."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        from stego import pipeline
+        self.pipeline = pipeline
+        self.old_block = pipeline._STREAM_BLOCK
+        pipeline._STREAM_BLOCK = 97  # many blocks, none aligned to anything
+
+    def tearDown(self):
+        self.pipeline._STREAM_BLOCK = self.old_block
+        self.tmpdir.cleanup()
+
+    def test_identical_to_in_memory(self):
+        secret = os.path.join(self.tmpdir.name, 'data.bin')
+        Path(secret).write_bytes(bytes(range(200)) * 3)
+        for channels in (1, 2):
+            cover = os.path.join(self.tmpdir.name, f'cover{channels}.wav')
+            gen_noise_wav(cover, 7000, channels=channels, seed=channels)
+            for n_lsb in (1, 3):
+                for key in ('a', 'b', 'c'):
+                    with self.subTest(channels=channels, n_lsb=n_lsb, key=key):
+                        mem = os.path.join(self.tmpdir.name, 'mem.wav')
+                        stream = os.path.join(self.tmpdir.name, 'stream.wav')
+                        p_mem = embed_to_file(cover, secret, mem, key, n_lsb, True, True, streaming=False)
+                        p_stream = embed_to_file(cover, secret, stream, key, n_lsb, True, True, streaming=True)
+                        self.assertEqual(Path(mem).read_bytes(), Path(stream).read_bytes())
+                        self.assertAlmostEqual(p_mem, p_stream, places=9)
+
+    def test_requires_wav_cover(self):
+        cover = os.path.join(self.tmpdir.name, 'cover.wav')
+        gen_noise_wav(cover, 3000)
+        secret = os.path.join(self.tmpdir.name, 's.txt')
+        Path(secret).write_text("x")
+        with self.assertRaises(ValueError):
+            embed_to_file(cover, secret, cover, 'k', 1, False, False, streaming=True)
+
+
+class TestPatchInPlaceEmbed(unittest.TestCase):
+    """Cloning the cover and patching samples keeps everything else intact."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(11)
+        self.pcm = rng.integers(-20000, 20000, size=9000, dtype=np.int16)
+        fmt = struct.pack("<HHIIHH", 1, 2, 8000, 8000 * 4, 4, 16)
+        info = b"INFOINAM\x06\x00\x00\x00title\x00"
+        data = self.pcm.astype('<i2').tobytes()
+        body = (b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+                + b"LIST" + struct.pack("<I", len(info)) + info
+                + b"data" + struct.pack("<I", len(data)) + data
+                + b"id3 " + struct.pack("<I", 4) + b"tail")
+        self.cover = os.path.join(self.tmpdir.name, 'cover.wav')
+        Path(self.cover).write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+        self.data_offset = Path(self.cover).read_bytes().index(b"data") + 8
+        self.secret = os.path.join(self.tmpdir.name, 'secret.bin')
+        Path(self.secret).write_bytes(bytes(range(256)) * 4)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_only_samples_change(self):
+        for n_lsb in (1, 2):
+            with self.subTest(n_lsb=n_lsb):
+                patched = os.path.join(self.tmpdir.name, 'patched.wav')
+                streamed = os.path.join(self.tmpdir.name, 'streamed.wav')
+                p_patch = embed_to_file(self.cover, self.secret, patched, 'key', n_lsb, True, True,
+                                        patch_in_place=True)
+                p_stream = embed_to_file(self.cover, self.secret, streamed, 'key', n_lsb, True, True,
+                                         streaming=True)
+                cover_b = Path(self.cover).read_bytes()
+                out_b = Path(patched).read_bytes()
+                end = self.data_offset + self.pcm.size * 2
+                self.assertEqual(len(out_b), len(cover_b))
+                self.assertEqual(out_b[:self.data_offset], cover_b[:self.data_offset])
+                self.assertEqual(out_b[end:], cover_b[end:])
+                self.assertEqual(_decode_to_samples(patched)[0].tobytes(),
+                                 _decode_to_samples(streamed)[0].tobytes())
+                self.assertAlmostEqual(p_patch, p_stream, places=9)
+                outdir = os.path.join(self.tmpdir.name, f'out{n_lsb}')
+                os.makedirs(outdir)
+                path, _ = extract_to_file(patched, 'key', outdir)
+                self.assertEqual(Path(path).read_bytes(), Path(self.secret).read_bytes())
+
+
+class TestLazyExtraction(unittest.TestCase):
+    """WAV extraction reads only the samples that carry data."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_reads_only_payload_window(self):
+        from unittest import mock
+        from stego import pipeline
+        from stego.wavio import PCM16File
+
+        cover = os.path.join(self.tmpdir.name, 'big.wav')
+        gen_noise_wav(cover, 400000, seed=3)
+        secret = os.path.join(self.tmpdir.name, 'small.bin')
+        Path(secret).write_bytes(os.urandom(1000))
+        out = os.path.join(self.tmpdir.name, 'stego.wav')
+        embed_to_file(cover, secret, out, 'lazy', 1, True, True, compute_psnr=False)
+
+        read = []
+
+        class CountingFile(PCM16File):
+            def read(self, lo, hi):
+                block = super().read(lo, hi)
+                read.append(block.size)
+                return block
+
+        outdir = os.path.join(self.tmpdir.name, 'x')
+        os.makedirs(outdir)
+        with mock.patch.object(pipeline, 'PCM16File', CountingFile):
+            path, _ = extract_to_file(out, 'lazy', outdir)
+        self.assertEqual(Path(path).read_bytes(), Path(secret).read_bytes())
+        self.assertLess(sum(read), 152 + (1000 + 20) * 8 * 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,94 @@
+import sys
+import hashlib
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path for imports
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from stego.crypto import (
+    SHAKE_BLOCK, ShakeStream, Vigenere256, shake256_xor, vigenere256_encrypt, vigenere256_decrypt,
+)
+
+
+def _ref_encrypt(data: bytes, key: bytes) -> bytes:
+    """The original per-byte implementation, kept as the compatibility oracle."""
+    return bytes((d + key[i % len(key)]) & 0xFF for i, d in enumerate(data))
+
+
+class TestVigenere256(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.data = rng.integers(0, 256, size=10007, dtype=np.uint8).tobytes()
+        self.key = "kunci rahasia ✓".encode('utf-8')
+
+    def test_matches_reference(self):
+        for key in (b"k", self.key, bytes(range(256))):
+            with self.subTest(key_len=len(key)):
+                ct = vigenere256_encrypt(self.data, key)
+                self.assertEqual(ct, _ref_encrypt(self.data, key))
+                self.assertEqual(vigenere256_decrypt(ct, key), self.data)
+
+    def test_offset_slices(self):
+        ct = vigenere256_encrypt(self.data, self.key)
+        for lo, hi in ((0, 1), (5, 17), (1000, 4321), (9999, 10007)):
+            with self.subTest(lo=lo):
+                self.assertEqual(vigenere256_encrypt(self.data[lo:hi], self.key, offset=lo), ct[lo:hi])
+                self.assertEqual(vigenere256_decrypt(ct[lo:hi], self.key, offset=lo), self.data[lo:hi])
+
+    def test_stateful_chunks(self):
+        ct = vigenere256_encrypt(self.data, self.key)
+        enc = Vigenere256(self.key)
+        out = b"".join(enc.encrypt(self.data[i:i + 333]) for i in range(0, len(self.data), 333))
+        self.assertEqual(out, ct)
+        dec = Vigenere256(self.key)
+        dec.seek(4000)
+        self.assertEqual(dec.decrypt(memoryview(ct)[4000:4100]), self.data[4000:4100])
+        self.assertEqual(dec.offset, 4100)
+
+    def test_empty_inputs(self):
+        self.assertEqual(vigenere256_encrypt(b"", b""), b"")
+        with self.assertRaises(ValueError):
+            vigenere256_encrypt(b"x", b"")
+
+
+class TestShakeStream(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(12)
+        self.data = rng.integers(0, 256, size=2 * SHAKE_BLOCK + 1234, dtype=np.uint8).tobytes()
+        self.key = b"stream key"
+        self.nonce = bytes(range(16))
+
+    def test_counter_mode_definition(self):
+        base = b"stego/shake256-ctr\0" + len(self.key).to_bytes(4, "little") + self.key + self.nonce
+        ks = b"".join(hashlib.shake_256(base + j.to_bytes(8, "little")).digest(SHAKE_BLOCK) for j in range(3))
+        expected = bytes(a ^ b for a, b in zip(self.data, ks))
+        self.assertEqual(shake256_xor(self.data, self.key, self.nonce), expected)
+
+    def test_seekable_slices(self):
+        ct = shake256_xor(self.data, self.key, self.nonce)
+        for lo, hi in ((0, 10), (SHAKE_BLOCK - 5, SHAKE_BLOCK + 5), (SHAKE_BLOCK + 7, len(self.data))):
+            with self.subTest(lo=lo):
+                self.assertEqual(shake256_xor(ct[lo:hi], self.key, self.nonce, offset=lo), self.data[lo:hi])
+        enc = ShakeStream(self.key, self.nonce)
+        out = b"".join(enc.encrypt(self.data[i:i + 40000]) for i in range(0, len(self.data), 40000))
+        self.assertEqual(out, ct)
+        enc.seek(SHAKE_BLOCK - 1)
+        self.assertEqual(enc.decrypt(ct[SHAKE_BLOCK - 1:SHAKE_BLOCK + 1]), self.data[SHAKE_BLOCK - 1:SHAKE_BLOCK + 1])
+
+    def test_nonce_and_key_change_keystream(self):
+        ct = shake256_xor(self.data[:64], self.key, self.nonce)
+        self.assertNotEqual(ct, shake256_xor(self.data[:64], self.key, bytes(16)))
+        self.assertNotEqual(ct, shake256_xor(self.data[:64], b"other key", self.nonce))
+        with self.assertRaises(ValueError):
+            ShakeStream(b"", self.nonce)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
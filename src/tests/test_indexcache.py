@@ -0,0 +1,118 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+# Add src directory to path for imports
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from stego import mp3stream
+from stego.indexcache import FrameIndexCache
+from stego.mp3stream import MP3Stream
+
+
+def _frame(pad: int, seed: int) -> bytes:
+    head = bytes([0xFF, 0xFB, 0x90 | (pad << 1), 0x00])
+    body = np.random.default_rng(seed).integers(0, 0xFF, size=413 + pad, dtype=np.uint8)
+    return head + body.tobytes()
+
+
+def _mp3(path: str, n: int, seed: int = 0):
+    Path(path).write_bytes(b"".join(_frame(i % 2, seed + i) for i in range(n)))
+
+
+class TestFrameIndexCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = FrameIndexCache(os.path.join(self.tmpdir.name, 'cache'))
+        self.mp3 = os.path.join(self.tmpdir.name, 'cover.mp3')
+        _mp3(self.mp3, 200)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_hit_skips_scan(self):
+        with MP3Stream(self.mp3, cache=self.cache) as st:
+            ref = st.index.copy()
+        self.assertEqual(self.cache.stats()["stores"], 1)
+        with mock.patch.object(mp3stream, "_frame_candidates", side_effect=AssertionError("scanned")):
+            with MP3Stream(self.mp3, cache=self.cache) as st:
+                self.assertTrue(np.array_equal(st.index, ref))
+                self.assertEqual(list(st.iter_padding_slots()), st.padding_slots().tolist())
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+    def test_rewritten_file_misses(self):
+        with MP3Stream(self.mp3, cache=self.cache) as st:
+            st.index
+        _mp3(self.mp3, 120, seed=5)
+        os.utime(self.mp3, ns=(1, 1))
+        with MP3Stream(self.mp3, cache=self.cache) as st:
+            self.assertEqual(len(st.index), 120)
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+    def test_corrupt_entry_is_dropped(self):
+        with MP3Stream(self.mp3, cache=self.cache) as st:
+            ref = st.index.copy()
+        entry = os.path.join(self.cache.directory, os.listdir(self.cache.directory)[0])
+        with open(entry, 'r+b') as f:
+            f.truncate(100)
+        with MP3Stream(self.mp3, cache=self.cache) as st:
+            self.assertTrue(np.array_equal(st.index, ref))
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["stores"], stats["entries"]), (0, 2, 1))
+
+    def test_size_limit_evicts_oldest(self):
+        entry_bytes = 56 + 200 * mp3stream.FRAME_DTYPE.itemsize
+        self.cache.set_max_bytes(2 * entry_bytes)
+        paths = []
+        for i in range(4):
+            p = os.path.join(self.tmpdir.name, f'c{i}.mp3')
+            _mp3(p, 200, seed=10 * i)
+            paths.append(p)
+            with MP3Stream(p, cache=self.cache) as st:
+                st.index
+            entry = self.cache._entry_path(self.cache.key_for(p))
+            os.utime(entry, ns=(i + 1, i + 1))
+        stats = self.cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertLessEqual(stats["bytes"], 2 * entry_bytes)
+        self.assertGreaterEqual(stats["evictions"], 2)
+        self.assertIsNotNone(self.cache.load(self.cache.key_for(paths[-1])))
+        self.assertIsNone(self.cache.load(self.cache.key_for(paths[0])))
+
+    def test_stores_do_not_rescan_directory(self):
+        index = MP3Stream(self.mp3).index
+        entry_bytes = 56 + index.nbytes
+        self.cache.set_max_bytes(20 * entry_bytes)
+        with mock.patch.object(self.cache, "_entries", wraps=self.cache._entries) as scans:
+            for i in range(100):
+                self.cache.store(i.to_bytes(32, "big"), index)
+        # One scan to seed the running total, then one per eviction round,
+        # each of which frees a tenth of the budget.
+        self.assertLessEqual(scans.call_count, 1 + 100 // 2)
+        stats = self.cache.stats()
+        self.assertLessEqual(stats["bytes"], 20 * entry_bytes)
+        self.assertEqual(stats["stores"], 100)
+        self.assertEqual(self.cache._nbytes, stats["bytes"])
+
+    def test_disabled_and_lazy_use(self):
+        off = FrameIndexCache()
+        with MP3Stream(self.mp3, cache=off) as st:
+            self.assertEqual(len(st.frames), 200)
+        self.assertEqual(off.stats()["stores"], 0)
+        # A scan stopped early is never stored.
+        with mock.patch.object(mp3stream, "SCAN_CHUNK", 4096), MP3Stream(self.mp3, cache=self.cache) as st:
+            next(st.iter_frames())
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,196 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path for imports
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from stego.bitops import bits_from_bytes, bytes_from_bits
+from stego.pipeline import (
+    _build_header,
+    _embed_bits_into_samples,
+    _extract_bits_from_samples,
+    _probe_candidates,
+)
+from stego.seed import seed_from_key
+
+
+def _reference_embed(samples, data: bytes, n_lsb: int, start_seed_index: int):
+    """Per-sample embed loop the vectorized kernel must reproduce exactly."""
+    N = samples.size
+    if N == 0:
+        return 0
+    bit_iter = bits_from_bytes(data)
+    mask = (1 << n_lsb) - 1
+    idx = start_seed_index % N
+    written = 0
+    while True:
+        val = 0
+        bits_in_group = 0
+        for j in range(n_lsb):
+            try:
+                val |= (next(bit_iter) & 1) << j
+                bits_in_group += 1
+            except StopIteration:
+                break
+        if bits_in_group == 0:
+            break
+        s = (int(samples[idx]) & ~mask) | val
+        samples[idx] = ((s + 0x8000) & 0xFFFF) - 0x8000
+        written += bits_in_group
+        idx += 1
+        if idx == N:
+            idx = 0
+        if bits_in_group < n_lsb:
+            break
+    return written
+
+
+def _reference_extract(samples, total_bits: int, n_lsb: int, start_seed_index: int) -> bytes:
+    """Per-bit extraction loop the vectorized kernel must reproduce exactly."""
+    N = samples.size
+    if N == 0:
+        return b""
+    mask = (1 << n_lsb) - 1
+    idx = start_seed_index % N
+    bits = []
+    while len(bits) < total_bits:
+        val = int(samples[idx]) & mask
+        for j in range(n_lsb):
+            bits.append((val >> j) & 1)
+            if len(bits) >= total_bits:
+                break
+        idx += 1
+        if idx == N:
+            idx = 0
+    return bytes_from_bits(bits)
+
+
+def _random_samples(rng, n: int):
+    return rng.integers(-32768, 32768, size=n, dtype=np.int16)
+
+
+class TestEmbedKernel(unittest.TestCase):
+    """The vectorized embed kernel must be bit-identical to the per-sample loop."""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(1234)
+
+    def _check(self, n_samples: int, payload_len: int, n_lsb: int, start: int):
+        cover = _random_samples(self.rng, n_samples)
+        data = self.rng.integers(0, 256, size=payload_len, dtype=np.uint8).tobytes()
+        expected = cover.copy()
+        actual = cover.copy()
+        w_ref = _reference_embed(expected, data, n_lsb, start)
+        w_new = _embed_bits_into_samples(actual, data, n_lsb, start)
+        self.assertEqual(w_new, w_ref)
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_matches_reference(self):
+        for n_lsb in (1, 2, 3, 4):
+            for start in (0, 17, 999):
+                with self.subTest(n_lsb=n_lsb, start=start):
+                    self._check(1000, 37, n_lsb, start)
+
+    def test_wraparound(self):
+        for n_lsb in (1, 3):
+            with self.subTest(n_lsb=n_lsb):
+                self._check(300, 30, n_lsb, 290)
+
+    def test_more_bits_than_samples(self):
+        # The reference keeps writing around the ring; the last lap wins.
+        for n_lsb in (1, 2, 3, 4):
+            with self.subTest(n_lsb=n_lsb):
+                self._check(50, 40, n_lsb, 7)
+
+    def test_empty_inputs(self):
+        self.assertEqual(_embed_bits_into_samples(np.zeros(0, dtype=np.int16), b"abc", 2, 0), 0)
+        samples = _random_samples(self.rng, 10)
+        before = samples.copy()
+        self.assertEqual(_embed_bits_into_samples(samples, b"", 2, 3), 0)
+        np.testing.assert_array_equal(samples, before)
+
+
+class TestExtractKernel(unittest.TestCase):
+    """The vectorized extraction kernel must match the per-bit loop."""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(4321)
+
+    def test_matches_reference(self):
+        samples = _random_samples(self.rng, 500)
+        for n_lsb in (1, 2, 3, 4):
+            for total_bits in (0, 1, 7, 8, 31, 32, 333):
+                for start in (0, 123, 499):
+                    with self.subTest(n_lsb=n_lsb, total_bits=total_bits, start=start):
+                        self.assertEqual(
+                            _extract_bits_from_samples(samples, total_bits, n_lsb, start),
+                            _reference_extract(samples, total_bits, n_lsb, start),
+                        )
+
+    def test_reads_past_one_lap(self):
+        samples = _random_samples(self.rng, 20)
+        for n_lsb in (1, 3):
+            with self.subTest(n_lsb=n_lsb):
+                self.assertEqual(
+                    _extract_bits_from_samples(samples, 200, n_lsb, 5),
+                    _reference_extract(samples, 200, n_lsb, 5),
+                )
+
+    def test_round_trip_across_chunks(self):
+        from stego import pipeline
+        samples = _random_samples(self.rng, 3000)
+        data = self.rng.integers(0, 256, size=300, dtype=np.uint8).tobytes()
+        old = pipeline._KERNEL_CHUNK
+        pipeline._KERNEL_CHUNK = 64  # force many chunks
+        try:
+            for n_lsb in (1, 2, 3, 4):
+                with self.subTest(n_lsb=n_lsb):
+                    work = samples.copy()
+                    _embed_bits_into_samples(work, data, n_lsb, 2900)
+                    self.assertEqual(_extract_bits_from_samples(work, len(data) * 8, n_lsb, 2900), data)
+        finally:
+            pipeline._KERNEL_CHUNK = old
+
+
+class TestProbeCandidates(unittest.TestCase):
+    """The header probe must keep the real embedding and drop everything else."""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(99)
+
+    def _stego(self, n_lsb: int, randomized: bool, key: str = "k3y"):
+        samples = _random_samples(self.rng, 4000)
+        body = b"probe me"
+        hdr = _build_header(False, randomized, n_lsb, len(body), "f", ".txt")
+        blob = hdr + body
+        buf = len(blob).to_bytes(4, "big") + blob
+        start = seed_from_key(key) % samples.size if randomized else 0
+        _embed_bits_into_samples(samples, buf, n_lsb, start)
+        return samples, start, len(blob)
+
+    def test_finds_embedded_parameters(self):
+        for n_lsb in (1, 2, 3, 4):
+            for randomized in (True, False):
+                with self.subTest(n_lsb=n_lsb, randomized=randomized):
+                    samples, start, total_len = self._stego(n_lsb, randomized)
+                    found = _probe_candidates(samples, "k3y")
+                    self.assertIn((n_lsb, randomized, start, total_len), found)
+                    self.assertEqual(len(found), 1)
+
+    def test_rejects_plain_audio(self):
+        samples = _random_samples(self.rng, 4000)
+        self.assertEqual(_probe_candidates(samples, "k3y"), [])
+        self.assertEqual(_probe_candidates(np.zeros(0, dtype=np.int16), "k3y"), [])
+
+    def test_wrong_key_misses_randomized_start(self):
+        samples, _, _ = self._stego(2, True, key="right")
+        self.assertEqual(_probe_candidates(samples, "wrong"), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,81 @@
+import os
+import sys
+import math
+import wave
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path for imports
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from stego.psnr import audio_metrics, psnr_from_sse
+
+
+def _write_wav(path: str, pcm, channels: int = 1, fr: int = 8000):
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(fr)
+        wf.writeframes(np.asarray(pcm, dtype='<i2').tobytes())
+
+
+class TestAudioMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(5)
+        self.a = rng.integers(-20000, 20000, size=10007, dtype=np.int16)
+        self.b = self.a.copy()
+        self.b[1234:1300] ^= 3
+        self.b[9000] += 9
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _expected(self, a, b):
+        n = min(a.size, b.size)
+        d = b[:n].astype(np.int64) - a[:n]
+        sse = int((d * d).sum())
+        nz = np.flatnonzero(d)
+        return {
+            "samples": n,
+            "mse": sse / n,
+            "psnr": psnr_from_sse(sse, n),
+            "snr": 10 * math.log10(int((a[:n].astype(np.int64) ** 2).sum()) / sse),
+            "max_abs_diff": int(np.abs(d).max()),
+            "changed_samples": int(nz.size),
+            "first_changed": int(nz[0]),
+            "last_changed": int(nz[-1]),
+        }
+
+    def test_arrays_any_block_size(self):
+        expected = self._expected(self.a, self.b)
+        for block in (1, 7, 1000, 1 << 16):
+            with self.subTest(block=block):
+                self.assertEqual(audio_metrics(self.a, self.b, block_samples=block), expected)
+
+    def test_wav_paths_and_mixed_sources(self):
+        pa = os.path.join(self.tmpdir.name, 'a.wav')
+        pb = os.path.join(self.tmpdir.name, 'b.wav')
+        _write_wav(pa, self.a)
+        _write_wav(pb, self.b[:9500])  # shorter: compare the common prefix
+        expected = self._expected(self.a, self.b[:9500])
+        self.assertEqual(audio_metrics(pa, pb, block_samples=333), expected)
+        self.assertEqual(audio_metrics(self.a, pb, block_samples=4096), expected)
+
+    def test_identical_sources(self):
+        m = audio_metrics(self.a, self.a.copy(), block_samples=100)
+        self.assertEqual(m["psnr"], float('inf'))
+        self.assertEqual(m["snr"], float('inf'))
+        self.assertEqual(m["changed_samples"], 0)
+        self.assertIsNone(m["first_changed"])
+        self.assertIsNone(m["last_changed"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,292 @@
+import io
+import os
+import sys
+import time
+import tempfile
+import itertools
+import struct
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path for imports
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from stego import mp3stream
+from stego.mp3stream import BITRATES, FRAME_DTYPE, SAMPLERATES, Frame, FrameList, MP3Stream
+
+
+def _ref_scan(data: bytes):
+    """The original byte-by-byte scanner."""
+    frames = []
+    i = 0; n = len(data)
+    if n >= 10 and data[:3] == b"ID3":
+        i = 10 + (((data[6] & 0x7F) << 21) | ((data[7] & 0x7F) << 14) | ((data[8] & 0x7F) << 7) | (data[9] & 0x7F))
+    while i + 4 <= n:
+        if data[i] == 0xFF and (data[i+1] & 0xE0) == 0xE0:
+            h = data[i:i+4]
+            version_id = (h[1] >> 3) & 0b11
+            layer = (h[1] >> 1) & 0b11
+            br = (h[2] >> 4) & 0b1111
+            sr = (h[2] >> 2) & 0b11
+            pad = (h[2] >> 1) & 0b1
+            if version_id != 0b11 or layer != 0b01 or br == 0 or br == 0b1111 or sr == 0b11:
+                i += 1; continue
+            bitrate = BITRATES[br] * 1000
+            samplerate = SAMPLERATES[sr]
+            frame_len = int((144 * bitrate) // samplerate + pad)
+            if i + frame_len > n:
+                i += 1; continue
+            ch = 1 if (h[3] >> 6) & 0b11 == 0b11 else 2
+            frames.append(Frame(i, frame_len, ch, pad, bitrate, samplerate))
+            i += frame_len
+        else:
+            i += 1
+    return frames
+
+
+def _frame(br: int = 0b1001, sr: int = 0b00, pad: int = 0, mono: bool = False, seed: int = 0):
+    """One MPEG-1 Layer III frame with random (sync-free) body bytes."""
+    size = 144 * BITRATES[br] * 1000 // SAMPLERATES[sr] + pad
+    head = bytes([0xFF, 0xFB, (br << 4) | (sr << 2) | (pad << 1), (0b11 if mono else 0b00) << 6])
+    body = np.random.default_rng(seed).integers(0, 0xFF, size=size - 4, dtype=np.uint8)
+    return head + body.tobytes()
+
+
+def _id3v2(payload: bytes) -> bytes:
+    n = len(payload)
+    size = bytes([(n >> 21) & 0x7F, (n >> 14) & 0x7F, (n >> 7) & 0x7F, n & 0x7F])
+    return b"ID3\x03\x00\x00" + size + payload
+
+
+def _apev2(items: bytes) -> bytes:
+    footer = b"APETAGEX" + struct.pack("<IIII", 2000, len(items) + 32, 1, 0) + b"\0" * 8
+    return items + footer
+
+
+class TestFrameScanner(unittest.TestCase):
+
+    def setUp(self):
+        brs = (0b1001, 0b1110, 0b0101, 0b1011)
+        self.parts = [_frame(br=brs[i % 4], pad=i % 2, mono=i % 5 == 0, seed=i) for i in range(40)]
+        self.frames = b"".join(self.parts)
+
+    def test_clean_files_match_original(self):
+        art = b"\xff\xfb\x90\x00" * 50 + b"\xff" * 300    # sync-looking album art
+        tail_v1 = b"TAG" + b"\0" * 125
+        cases = {
+            "bare": self.frames,
+            "id3v2": _id3v2(art) + self.frames,
+            "id3v1": self.frames + tail_v1,
+            "ape+id3v1": _id3v2(b"x" * 20) + self.frames + _apev2(b"k" * 40) + tail_v1,
+        }
+        for name, data in cases.items():
+            with self.subTest(case=name):
+                self.assertEqual(MP3Stream(data).frames, _ref_scan(data))
+                self.assertEqual(len(MP3Stream(data).frames), 40)
+
+    def test_rejects_false_sync(self):
+        lone = _frame(seed=99)       # one frame-looking header in junk, not followed by another
+        junk = b"\0" * 100 + lone + b"\x13" * 50
+        data = junk + self.frames + junk
+        frames = MP3Stream(data).frames
+        self.assertEqual(len(frames), 40)
+        self.assertEqual(frames[0].offset, len(junk))
+        self.assertEqual(len(_ref_scan(data)), 42)
+
+    def test_resyncs_after_junk(self):
+        head = b"".join(self.parts[:3])
+        data = head + b"\x00\xff" * 333 + self.frames
+        got = MP3Stream(data).frames
+        self.assertEqual(len(got), 3 + 40)
+        self.assertEqual(got[3].offset, len(head) + 666)
+
+    def test_adversarial_input_is_fast(self):
+        # Valid headers on every 4th byte that never chain into each other.
+        data = b"\xff\xfb\x90\x00" * (1 << 18) + b"\xff" * (1 << 20)
+        t0 = time.perf_counter()
+        frames = MP3Stream(data).frames
+        self.assertEqual(frames, [])
+        self.assertLess(time.perf_counter() - t0, 5.0)
+
+
+class TestFrameIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.data = b"".join(_frame(br=(0b1001, 0b0101)[i % 2], pad=i % 3 == 0, mono=i >= 20, seed=i)
+                             for i in range(30))
+        self.ref = _ref_scan(self.data)
+
+    def test_index_and_frame_view(self):
+        st = MP3Stream(self.data)
+        self.assertEqual(st.index.dtype, FRAME_DTYPE)
+        self.assertEqual(st.index["offset"].tolist(), [fr.offset for fr in self.ref])
+        frames = st.frames
+        self.assertIsInstance(frames, FrameList)
+        self.assertEqual(frames, self.ref)
+        self.assertEqual(list(frames), self.ref)
+        self.assertEqual(frames[0], self.ref[0])
+        self.assertEqual(frames[-1], self.ref[-1])
+        self.assertEqual(list(frames[5:9]), self.ref[5:9])
+        self.assertIsInstance(frames[3].offset, int)
+
+    def test_array_queries(self):
+        st = MP3Stream(self.data)
+        slots = [fr.offset + fr.size - 1 for fr in self.ref if fr.padding == 1]
+        self.assertEqual(st.padding_slots().tolist(), slots)
+        self.assertEqual(list(st.iter_padding_slots()), slots)
+        self.assertEqual(st.stats(), {"total_frames": 30, "padded_frames": 10, "stereo": True, "valid": True})
+        mono = MP3Stream(b"".join(_frame(mono=True, seed=i) for i in range(5)))
+        self.assertFalse(mono.stats()["stereo"])
+        empty = MP3Stream(b"\0" * 100)
+        self.assertEqual(len(empty.frames), 0)
+        self.assertEqual(empty.padding_slots().size, 0)
+        self.assertEqual(empty.stats(), {"total_frames": 0, "padded_frames": 0, "stereo": False, "valid": False})
+
+
+def _cbr(n: int, br: int = 0b1001, sr: int = 0b00, first_pad: int = 0) -> list:
+    """Frames padded the way encoders do: whenever the running byte count
+    falls behind 144 * bitrate / samplerate."""
+    step = 144 * BITRATES[br] * 1000
+    rate = SAMPLERATES[sr]
+    acc = first_pad * rate
+    out = []
+    for i in range(n):
+        acc += step % rate
+        pad = 1 if acc >= rate else 0
+        acc -= pad * rate
+        out.append(_frame(br=br, sr=sr, pad=pad, seed=i))
+    return out
+
+
+def _tag_frame(kind: bytes, frames: int, nbytes: int, delay: int = 0, padding: int = 0) -> bytes:
+    fr = bytearray(_frame(seed=1234))
+    at = 4 + 32
+    if kind == b"VBRI":
+        fr[at:at + 18] = b"VBRI" + bytes(6) + struct.pack(">II", nbytes, frames)
+    else:
+        body = kind + struct.pack(">III", 3, frames, nbytes)
+        lame = b"LAME3.100" + bytes(12) + ((delay << 12) | padding).to_bytes(3, "big")
+        fr[at:at + len(body) + len(lame)] = body + lame
+    return bytes(fr)
+
+
+class TestEstimate(unittest.TestCase):
+
+    def _check(self, data, method):
+        st = MP3Stream(data)
+        est = st.estimate()
+        self.assertLess(st._pos, 16 * 1024)
+        full = MP3Stream(data)
+        index = full.index
+        self.assertEqual(est["method"], method)
+        self.assertEqual(est["total_frames"], index.size)
+        padded = int(np.count_nonzero(index["padding"]))
+        self.assertLessEqual(abs(est["padded_frames"] - padded), 1)
+        self.assertEqual(full.estimate()["method"], "scan")
+        self.assertEqual(full.estimate()["total_frames"], index.size)
+        self.assertEqual(full.estimate()["duration"], est["duration"])
+        return est
+
+    def test_cbr(self):
+        for br, sr in ((0b1001, 0b00), (0b1110, 0b00), (0b0101, 0b01), (0b1011, 0b10)):
+            with self.subTest(br=br, sr=sr):
+                data = _id3v2(b"x" * 500) + b"".join(_cbr(600, br, sr)) + b"TAG" + bytes(125)
+                est = self._check(data, "cbr")
+                self.assertAlmostEqual(est["duration"], 600 * 1152 / SAMPLERATES[sr])
+
+    def test_info_and_xing_tags(self):
+        audio = b"".join(_cbr(500))
+        est = self._check(_tag_frame(b"Info", 500, len(audio), 576, 1000) + audio, "info")
+        self.assertAlmostEqual(est["duration"], (500 * 1152 - 1576) / 44100)
+        # LAME VBR output: the bitrate changes per frame and no frame is padded.
+        vbr = b"".join(_frame(br=(0b1001, 0b1110, 0b0101)[i % 3], seed=i) for i in range(400))
+        est = self._check(_tag_frame(b"Xing", 400, len(vbr)) + vbr, "xing")
+        self.assertEqual(est["padded_frames"], 0)
+        self.assertAlmostEqual(est["duration"], 400 * 1152 / 44100)
+
+    def test_vbri_tag(self):
+        audio = b"".join(_frame(br=(0b1011, 0b1001)[i % 2], seed=i) for i in range(300))
+        est = self._check(_tag_frame(b"VBRI", 300, len(audio)) + audio, "vbri")
+        self.assertEqual(est["padded_frames"], 0)
+
+    def test_short_and_empty(self):
+        self._check(b"".join(_cbr(5)), "scan")
+        st = MP3Stream(b"\0" * 1000)
+        self.assertEqual(st.estimate(), {"method": "scan", "total_frames": 0, "duration": 0.0, "padded_frames": 0})
+        self.assertFalse(st.stats(estimate=True)["valid"])
+
+    def test_stats_estimate(self):
+        data = b"".join(_cbr(1000))
+        st = MP3Stream(data)
+        est = st.stats(estimate=True)
+        exact = MP3Stream(data).stats()
+        self.assertEqual(est["total_frames"], exact["total_frames"])
+        self.assertLessEqual(abs(est["padded_frames"] - exact["padded_frames"]), 1)
+        self.assertEqual(est["stereo"], exact["stereo"])
+
+
+class TestLazyStream(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        parts = [_frame(br=(0b1001, 0b1110)[i % 2], pad=(i // 2) % 2, seed=i) for i in range(300)]
+        junk = b"\0" * 7 + b"\xff\xfb\x90\x00" * 40 + _frame(seed=7)[:300]
+        self.data = _id3v2(b"art") + b"".join(parts[:150]) + junk + b"".join(parts[150:]) + b"TAG" + b"\0" * 125
+        self.path = os.path.join(self.tmpdir.name, "cover.mp3")
+        with open(self.path, "wb") as f:
+            f.write(self.data)
+        self.chunk = mp3stream.SCAN_CHUNK
+
+    def tearDown(self):
+        mp3stream.SCAN_CHUNK = self.chunk
+        self.tmpdir.cleanup()
+
+    def test_chunked_scan_matches_whole_scan(self):
+        whole = MP3Stream(self.data).frames
+        self.assertEqual(len(whole), 300)
+        for chunk in (1, 417, 1000, 5003):
+            with self.subTest(chunk=chunk):
+                mp3stream.SCAN_CHUNK = chunk
+                self.assertEqual(MP3Stream(self.data).frames, whole)
+                st = MP3Stream(self.data)
+                self.assertEqual(list(st.iter_frames()), list(whole))
+                self.assertTrue(np.array_equal(st.index, MP3Stream(self.data).index))
+
+    def test_path_and_file_object(self):
+        whole = MP3Stream(self.data).frames
+        with MP3Stream(self.path) as st:
+            self.assertEqual(st.frames, whole)
+        with open(self.path, "rb") as f, MP3Stream(f) as st:
+            self.assertEqual(list(st.iter_frames()), whole)
+        self.assertEqual(MP3Stream(io.BytesIO(self.data)).frames, whole)
+
+    def test_parallel_scan_matches_serial(self):
+        whole = MP3Stream(self.data).index
+        for workers, split in ((2, 1000), (4, 5000), (3, 17000)):
+            with self.subTest(workers=workers, split=split):
+                with MP3Stream(self.path) as st:
+                    self.assertTrue(np.array_equal(st.scan_parallel(workers, split), whole))
+                    self.assertTrue(np.array_equal(st.index, whole))
+        # Resumes from a partial scan; in-memory data falls back to the serial scan.
+        mp3stream.SCAN_CHUNK = 4096
+        with MP3Stream(self.path) as st:
+            next(st.iter_frames())
+            self.assertTrue(np.array_equal(st.scan_parallel(2, 3000), whole))
+        self.assertTrue(np.array_equal(MP3Stream(self.data).scan_parallel(4, 1000), whole))
+
+    def test_early_stop_scans_only_what_is_consumed(self):
+        mp3stream.SCAN_CHUNK = 4096
+        ref = list(MP3Stream(self.data).iter_padding_slots())
+        with MP3Stream(self.path) as st:
+            first = list(itertools.islice(st.iter_padding_slots(), 5))
+            self.assertEqual(first, ref[:5])
+            self.assertLess(st._pos, 3 * 4096)
+            self.assertEqual(list(st.iter_padding_slots()), ref)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,223 @@
+import io
+import os
+import sys
+import shutil
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path for imports
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from fixtures import gen_noise_wav
+from stego.capability_exceptions import CapacityError, ExtractError
+from stego.pipeline import (
+    _build_header,
+    _decode_to_samples,
+    _embed_bits_into_samples,
+    _encode_samples_to_wav,
+    embed_to_file,
+    extract_to_file,
+)
+from stego.stegoio import StegoReader, StegoWriter
+
+
+class TestStegoReader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cover = os.path.join(self.tmpdir.name, 'cover.wav')
+        gen_noise_wav(self.cover, 60000)
+        self.secret_bytes = np.random.default_rng(8).integers(0, 256, size=5000, dtype=np.uint8).tobytes()
+        self.secret = os.path.join(self.tmpdir.name, 'archive.tar')
+        Path(self.secret).write_bytes(self.secret_bytes)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _stego(self, n_lsb, encrypt, key='rk'):
+        out = os.path.join(self.tmpdir.name, f'stego_{n_lsb}_{encrypt}.wav')
+        embed_to_file(self.cover, self.secret, out, key, n_lsb, encrypt, True, compute_psnr=False)
+        return out
+
+    def test_read_all_and_metadata(self):
+        for n_lsb in (1, 3):
+            for encrypt in (False, True):
+                with self.subTest(n_lsb=n_lsb, encrypt=encrypt):
+                    with StegoReader(self._stego(n_lsb, encrypt), 'rk') as r:
+                        self.assertEqual(r.size, len(self.secret_bytes))
+                        self.assertEqual(r.meta["name"] + r.meta["ext"], 'archive.tar')
+                        self.assertEqual(r.flags, {"encrypted": encrypt, "randomized": True, "n_lsb": n_lsb})
+                        self.assertEqual(r.read(), self.secret_bytes)
+                        self.assertEqual(r.read(10), b"")
+
+    def test_random_access(self):
+        rng = np.random.default_rng(1)
+        with StegoReader(self._stego(3, True), 'rk') as r:
+            for _ in range(50):
+                pos = int(rng.integers(0, r.size))
+                n = int(rng.integers(1, 300))
+                self.assertEqual(r.seek(pos), pos)
+                self.assertEqual(r.read(n), self.secret_bytes[pos:pos + n])
+                self.assertEqual(r.tell(), min(r.size, pos + n))
+            r.seek(-7, io.SEEK_END)
+            buf = bytearray(16)
+            self.assertEqual(r.readinto(buf), 7)
+            self.assertEqual(bytes(buf[:7]), self.secret_bytes[-7:])
+
+    def test_copyfileobj(self):
+        out = os.path.join(self.tmpdir.name, 'copy.bin')
+        with StegoReader(self._stego(2, True), 'rk') as r, open(out, 'wb') as f:
+            shutil.copyfileobj(r, f, 777)
+        self.assertEqual(Path(out).read_bytes(), self.secret_bytes)
+
+    def test_legacy_v1(self):
+        samples = np.array(_decode_to_samples(self.cover)[0], copy=True)
+        blob = _build_header(False, False, 2, len(self.secret_bytes), "old", ".bin") + self.secret_bytes
+        _embed_bits_into_samples(samples, struct.pack(">I", len(blob)) + blob, 2, 0)
+        out = os.path.join(self.tmpdir.name, 'v1.wav')
+        _encode_samples_to_wav(samples, 1, 8000, out)
+        with StegoReader(out, 'whatever') as r:
+            self.assertEqual(r.meta["name"], "old")
+            r.seek(1234)
+            self.assertEqual(r.read(100), self.secret_bytes[1234:1334])
+
+    def test_shake256_cipher(self):
+        out = os.path.join(self.tmpdir.name, 'shake.wav')
+        embed_to_file(self.cover, self.secret, out, 'rk', 3, True, True, compute_psnr=False, cipher="shake256")
+        outdir = os.path.join(self.tmpdir.name, 'x')
+        os.makedirs(outdir)
+        extract_to_file(out, 'rk', outdir)
+        self.assertEqual(Path(outdir, 'archive.tar').read_bytes(), self.secret_bytes)
+        with StegoReader(out, 'rk') as r:
+            self.assertEqual(r.size, len(self.secret_bytes))
+            r.seek(4321)
+            self.assertEqual(r.read(500), self.secret_bytes[4321:4821])
+        # A fresh nonce per embed: the same secret and key never reuse a keystream.
+        again = os.path.join(self.tmpdir.name, 'shake2.wav')
+        embed_to_file(self.cover, self.secret, again, 'rk', 3, True, True, compute_psnr=False, cipher="shake256")
+        self.assertNotEqual(Path(out).read_bytes(), Path(again).read_bytes())
+
+    def _tamper(self, path, payload_byte):
+        """Flip the lowest bit carrying payload byte ``payload_byte`` of a stego WAV."""
+        with StegoReader(path, 'rk') as r:
+            base, size, start, n_lsb = r._layout
+            g = (r._data_bit0 + payload_byte * 8) // n_lsb
+        samples = np.array(_decode_to_samples(path)[0], copy=True)
+        samples[base + (start + g) % size] ^= 1
+        _encode_samples_to_wav(samples, 1, 8000, path)
+
+    def test_authentication_tag(self):
+        for cipher in ("vigenere", "shake256"):
+            with self.subTest(cipher=cipher):
+                out = os.path.join(self.tmpdir.name, f'mac_{cipher}.wav')
+                embed_to_file(self.cover, self.secret, out, 'rk', 2, True, True,
+                              compute_psnr=False, cipher=cipher, mac=True)
+                with StegoReader(out, 'rk') as r:
+                    self.assertTrue(r.authenticated)
+                    self.assertTrue(r.verify())
+                    r.seek(100)
+                    self.assertEqual(r.read(50), self.secret_bytes[100:150])
+                    r.seek(0)
+                    self.assertEqual(r.read(), self.secret_bytes)
+
+                outdir = os.path.join(self.tmpdir.name, f'wrong_{cipher}')
+                os.makedirs(outdir)
+                with self.assertRaises(ExtractError):
+                    extract_to_file(out, 'wrong key', outdir)
+                self.assertEqual(os.listdir(outdir), [])
+
+                self._tamper(out, 1234)
+                with self.assertRaises(ExtractError):
+                    extract_to_file(out, 'rk', outdir)
+                with StegoReader(out, 'rk') as r:
+                    self.assertFalse(r.verify())
+                    with self.assertRaises(ExtractError):
+                        shutil.copyfileobj(r, io.BytesIO(), 1000)
+
+    def test_no_container(self):
+        with self.assertRaises(ExtractError):
+            StegoReader(self.cover, 'rk')
+
+
+class TestStegoWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cover = os.path.join(self.tmpdir.name, 'cover.wav')
+        gen_noise_wav(self.cover, 40000, seed=3)
+        self.secret_bytes = np.random.default_rng(4).integers(0, 256, size=4001, dtype=np.uint8).tobytes()
+        self.secret = os.path.join(self.tmpdir.name, 'dump.sql')
+        Path(self.secret).write_bytes(self.secret_bytes)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write_chunks(self, w, seed=0):
+        rng = np.random.default_rng(seed)
+        pos = 0
+        while pos < len(self.secret_bytes):
+            n = int(rng.integers(0, 400))
+            self.assertEqual(w.write(self.secret_bytes[pos:pos + n]), len(self.secret_bytes[pos:pos + n]))
+            pos += n
+
+    def test_matches_embed_to_file(self):
+        for n_lsb in (1, 2, 3, 4):
+            for encrypt in (False, True):
+                with self.subTest(n_lsb=n_lsb, encrypt=encrypt):
+                    ref = os.path.join(self.tmpdir.name, 'ref.wav')
+                    out = os.path.join(self.tmpdir.name, 'inc.wav')
+                    psnr = embed_to_file(self.cover, self.secret, ref, 'wk', n_lsb, encrypt, True, patch_in_place=True)
+                    with StegoWriter(self.cover, out, 'wk', n_lsb, name='dump', ext='.sql',
+                                     encrypt=encrypt, use_rand_start=True) as w:
+                        self._write_chunks(w, seed=n_lsb)
+                    self.assertEqual(Path(out).read_bytes(), Path(ref).read_bytes())
+                    self.assertAlmostEqual(w.psnr, psnr)
+
+    def test_decoded_cover_path(self):
+        # Writing over the cover itself rules out the clone/memmap path.
+        ref = os.path.join(self.tmpdir.name, 'ref.wav')
+        embed_to_file(self.cover, self.secret, ref, 'wk', 3, True, False, streaming=False)
+        with StegoWriter(self.cover, self.cover, 'wk', 3, name='dump', ext='.sql', encrypt=True) as w:
+            self._write_chunks(w)
+        self.assertEqual(Path(self.cover).read_bytes(), Path(ref).read_bytes())
+        outdir = os.path.join(self.tmpdir.name, 'x')
+        os.makedirs(outdir)
+        extract_to_file(self.cover, 'wk', outdir)
+        self.assertEqual(Path(outdir, 'dump.sql').read_bytes(), self.secret_bytes)
+
+    def test_shake256_round_trip(self):
+        out = os.path.join(self.tmpdir.name, 'inc.wav')
+        with StegoWriter(self.cover, out, 'wk', 3, name='dump', ext='.sql', encrypt=True,
+                         use_rand_start=True, cipher="shake256") as w:
+            self._write_chunks(w)
+        with StegoReader(out, 'wk') as r:
+            self.assertEqual(r.read(), self.secret_bytes)
+
+    def test_authenticated_matches_embed_to_file(self):
+        ref = os.path.join(self.tmpdir.name, 'ref.wav')
+        out = os.path.join(self.tmpdir.name, 'inc.wav')
+        embed_to_file(self.cover, self.secret, ref, 'wk', 3, True, True, patch_in_place=True, mac=True)
+        with StegoWriter(self.cover, out, 'wk', 3, name='dump', ext='.sql', encrypt=True,
+                         use_rand_start=True, mac=True) as w:
+            self._write_chunks(w)
+        self.assertEqual(Path(out).read_bytes(), Path(ref).read_bytes())
+        with StegoReader(out, 'wk') as r:
+            self.assertTrue(r.verify())
+
+    def test_overflow_removes_output(self):
+        out = os.path.join(self.tmpdir.name, 'big.wav')
+        with self.assertRaises(CapacityError):
+            with StegoWriter(self.cover, out, 'wk', 1) as w:
+                for _ in range(10):
+                    w.write(self.secret_bytes)
+        self.assertFalse(os.path.exists(out))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)